@@ -12,6 +12,19 @@ class Settings(BaseSettings):
     SMTP_PORT: int = Field(..., env="SMTP_PORT")
     SMTP_USER: str = Field(..., env="SMTP_USER")
     SMTP_PASSWORD: str = Field(..., env="SMTP_PASSWORD")
+    SMTP_STARTTLS: bool = Field(True, env="SMTP_STARTTLS")
+    SMTP_TIMEOUT_SECONDS: float = Field(30, env="SMTP_TIMEOUT_SECONDS")
+
+    # Outbound mail queue
+    EMAIL_WORKER_ENABLED: bool = Field(True, env="EMAIL_WORKER_ENABLED")
+    EMAIL_SMTP_POOL_SIZE: int = Field(4, env="EMAIL_SMTP_POOL_SIZE")
+    EMAIL_BATCH_SIZE: int = Field(200, env="EMAIL_BATCH_SIZE")
+    EMAIL_POLL_INTERVAL_SECONDS: float = Field(2.0, env="EMAIL_POLL_INTERVAL_SECONDS")
+    EMAIL_MAX_ATTEMPTS: int = Field(8, env="EMAIL_MAX_ATTEMPTS")
+    EMAIL_RETRY_BASE_SECONDS: float = Field(10, env="EMAIL_RETRY_BASE_SECONDS")
+    EMAIL_RETRY_MAX_SECONDS: float = Field(3600, env="EMAIL_RETRY_MAX_SECONDS")
+    # How long a claimed batch stays reserved before another worker may retry it
+    EMAIL_CLAIM_LEASE_SECONDS: float = Field(300, env="EMAIL_CLAIM_LEASE_SECONDS")
 
     # JWT settings
     JWT_ALGORITHM: str = Field(..., env="JWT_ALGORITHM")
@@ -19,6 +32,58 @@ class Settings(BaseSettings):
     JWT_REFRESH_TOKEN_EXPIRE_MINUTES: int = Field(..., env="JWT_REFRESH_TOKEN_EXPIRE_MINUTES")
 
     KEYS_DIR: str = Field(..., env="KEYS_DIR")
+    TOKEN_CACHE_TTL_SECONDS: int = Field(300, env="TOKEN_CACHE_TTL_SECONDS")
+    TOKEN_CACHE_MAX_SIZE: int = Field(10000, env="TOKEN_CACHE_MAX_SIZE")
+    USER_CACHE_TTL_SECONDS: int = Field(60, env="USER_CACHE_TTL_SECONDS")
+    USER_CACHE_MAX_SIZE: int = Field(10000, env="USER_CACHE_MAX_SIZE")
+
+    # Caching: leave CACHE_REDIS_URL empty for per-worker in-process caches
+    CACHE_REDIS_URL: str = Field("", env="CACHE_REDIS_URL")
+    PRODUCT_CACHE_TTL_SECONDS: int = Field(300, env="PRODUCT_CACHE_TTL_SECONDS")
+    PRODUCT_CACHE_MAX_SIZE: int = Field(5000, env="PRODUCT_CACHE_MAX_SIZE")
+
+    # Password hashing pool: bcrypt jobs beyond workers + queue depth get a 503
+    PASSWORD_HASH_WORKERS: int = Field(2, env="PASSWORD_HASH_WORKERS")
+    PASSWORD_HASH_QUEUE_DEPTH: int = Field(16, env="PASSWORD_HASH_QUEUE_DEPTH")
+
+    # Database settings
+    DATABASE_URL: str = Field("sqlite:///./khkr.db", env="DATABASE_URL")
+    # Derived from DATABASE_URL (aiosqlite / asyncpg) when left empty
+    ASYNC_DATABASE_URL: str = Field("", env="ASYNC_DATABASE_URL")
+    DB_POOL_SIZE: int = Field(10, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(20, env="DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT: int = Field(30, env="DB_POOL_TIMEOUT")
+    DB_POOL_RECYCLE: int = Field(1800, env="DB_POOL_RECYCLE")
+    DB_POOL_PRE_PING: bool = Field(True, env="DB_POOL_PRE_PING")
+    DB_STATEMENT_TIMEOUT_MS: int = Field(0, env="DB_STATEMENT_TIMEOUT_MS")
+
+    # SQLite performance profile (opt-in, applied on every new connection)
+    SQLITE_PERFORMANCE_PROFILE: bool = Field(False, env="SQLITE_PERFORMANCE_PROFILE")
+    SQLITE_SYNCHRONOUS: str = Field("NORMAL", env="SQLITE_SYNCHRONOUS")
+    SQLITE_MMAP_SIZE: int = Field(268435456, env="SQLITE_MMAP_SIZE")
+    SQLITE_CACHE_SIZE_KB: int = Field(65536, env="SQLITE_CACHE_SIZE_KB")
+    SQLITE_BUSY_TIMEOUT_MS: int = Field(5000, env="SQLITE_BUSY_TIMEOUT_MS")
+
+    # Order settings
+    ORDER_NUMBER_BLOCK_SIZE: int = Field(50, env="ORDER_NUMBER_BLOCK_SIZE")
+
+    # Idempotency-Key support on POST /orders/
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = Field(86400, env="IDEMPOTENCY_KEY_TTL_SECONDS")
+    # A request holds its key this long; a retry may take over after that
+    IDEMPOTENCY_LOCK_SECONDS: float = Field(60, env="IDEMPOTENCY_LOCK_SECONDS")
+    # How long a duplicate waits for the in-flight request before a 409
+    IDEMPOTENCY_WAIT_SECONDS: float = Field(10, env="IDEMPOTENCY_WAIT_SECONDS")
+
+    # Sharded stock counters for hot products. Fold every product back to
+    # 0 shards before turning this off, or their shard stock is ignored.
+    STOCK_SHARDING_ENABLED: bool = Field(False, env="STOCK_SHARDING_ENABLED")
+    STOCK_SHARD_REFRESH_SECONDS: float = Field(2.0, env="STOCK_SHARD_REFRESH_SECONDS")
+
+    # Rows per batched upsert in the bulk product import
+    PRODUCT_IMPORT_CHUNK_SIZE: int = Field(1000, env="PRODUCT_IMPORT_CHUNK_SIZE")
+
+    # Rows fetched per round trip by the streaming export endpoints
+    EXPORT_BATCH_SIZE: int = Field(1000, env="EXPORT_BATCH_SIZE")
             
     class Config:
         env_file = ".env"
@@ -0,0 +1,7 @@
+"""Async counterparts of the crud modules.
+
+Each function runs the matching sync crud function through
+``AsyncSession.run_sync``. The query logic stays in one place, while every
+database round trip goes through the async driver and yields to the event
+loop instead of blocking it.
+"""
@@ -0,0 +1,25 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from crud import address
+from models.address import Address
+from schemas.address import AddressCreate, AddressUpdate
+
+async def create_address(db: AsyncSession, address_data: AddressCreate) -> Address:
+    """Create a new address."""
+    return await db.run_sync(address.create_address, address_data)
+
+async def get_address(db: AsyncSession, address_id: int) -> Optional[Address]:
+    """Get an address by ID."""
+    return await db.run_sync(address.get_address, address_id)
+
+async def get_address_by_order(db: AsyncSession, order_id: int) -> Optional[Address]:
+    """Get address by order ID."""
+    return await db.run_sync(address.get_address_by_order, order_id)
+
+async def update_address(db: AsyncSession, address_id: int, update_data: AddressUpdate) -> Address:
+    """Update an existing address."""
+    return await db.run_sync(address.update_address, address_id, update_data)
+
+async def delete_address(db: AsyncSession, address_id: int) -> None:
+    """Delete an address."""
+    return await db.run_sync(address.delete_address, address_id)
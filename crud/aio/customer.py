@@ -0,0 +1,25 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from crud import customer
+from models.customer import Customer
+from schemas.customer import CustomerCreate, CustomerUpdate
+
+async def create_customer(db: AsyncSession, customer_data: CustomerCreate) -> Customer:
+    """Create a new customer."""
+    return await db.run_sync(customer.create_customer, customer_data)
+
+async def get_customer(db: AsyncSession, customer_id: int) -> Optional[Customer]:
+    """Get a customer by ID."""
+    return await db.run_sync(customer.get_customer, customer_id)
+
+async def get_customer_by_email(db: AsyncSession, email: str) -> Optional[Customer]:
+    """Get a customer by email."""
+    return await db.run_sync(customer.get_customer_by_email, email)
+
+async def update_customer(db: AsyncSession, customer_id: int, update_data: CustomerUpdate) -> Customer:
+    """Update an existing customer."""
+    return await db.run_sync(customer.update_customer, customer_id, update_data)
+
+async def delete_customer(db: AsyncSession, customer_id: int) -> None:
+    """Delete a customer."""
+    return await db.run_sync(customer.delete_customer, customer_id)
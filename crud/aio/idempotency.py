@@ -0,0 +1,16 @@
+from typing import Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from crud import idempotency
+from models.idempotency_key import IdempotencyKey
+
+async def claim_key(db: AsyncSession, user_id: int, key: str, fingerprint: str) -> Tuple[Optional[str], Optional[IdempotencyKey]]:
+    """Take ownership of ``(user_id, key)``, or return the record of the request that has it."""
+    return await db.run_sync(idempotency.claim_key, user_id, key, fingerprint)
+
+async def get_key(db: AsyncSession, user_id: int, key: str) -> Optional[IdempotencyKey]:
+    """Read the current state of a key."""
+    return await db.run_sync(idempotency.get_key, user_id, key)
+
+async def release_key(db: AsyncSession, user_id: int, key: str, claim: str) -> None:
+    """Give up a claimed key after a failed request, so a retry runs it again."""
+    return await db.run_sync(idempotency.release_key, user_id, key, claim)
@@ -0,0 +1,11 @@
+from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from crud import inventory
+
+async def set_stock_shards(db: AsyncSession, product_id: int, shards: int) -> dict:
+    """Split a product's stock across ``shards`` counters; 0 or 1 folds it back into the product row."""
+    return await db.run_sync(inventory.set_stock_shards, product_id, shards)
+
+async def refresh_sharded_stock(db: AsyncSession) -> List[int]:
+    """Fold shard totals into products.stock_quantity / stock_status."""
+    return await db.run_sync(inventory.refresh_sharded_stock)
@@ -0,0 +1,42 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from crud import invoice
+from models.invoice import Invoice
+from schemas.invoice import InvoiceCreate, InvoiceUpdate
+from utils.pagination import Cursor, Page
+
+async def create_invoice(db: AsyncSession, invoice_data: InvoiceCreate) -> Invoice:
+    """Create a new invoice."""
+    return await db.run_sync(invoice.create_invoice, invoice_data)
+
+async def generate_invoices(db: AsyncSession, incremental: bool = False, since_order_id: Optional[int] = None) -> dict:
+    """Create the missing invoice of every uninvoiced order in one INSERT ... SELECT."""
+    return await db.run_sync(invoice.generate_invoices, incremental, since_order_id)
+
+async def get_invoices(db: AsyncSession, skip: int = 0, limit: int = 10, cursor: Optional[Cursor] = None) -> Page:
+    """Get a page of invoices, most recently issued first."""
+    return await db.run_sync(invoice.get_invoices, skip, limit, cursor)
+
+async def get_invoice(db: AsyncSession, invoice_id: int) -> Optional[Invoice]:
+    """Get an invoice by ID."""
+    return await db.run_sync(invoice.get_invoice, invoice_id)
+
+async def get_invoice_summary(db: AsyncSession, invoice_id: int):
+    """An invoice as an InvoiceListOut row, plus updated_at."""
+    return await db.run_sync(invoice.get_invoice_summary, invoice_id)
+
+async def get_invoice_version(db: AsyncSession, invoice_id: int):
+    """(id, updated_at) of an invoice, without loading the row."""
+    return await db.run_sync(invoice.get_invoice_version, invoice_id)
+
+async def get_invoice_by_order(db: AsyncSession, order_id: int) -> Optional[Invoice]:
+    """Get invoice by order ID."""
+    return await db.run_sync(invoice.get_invoice_by_order, order_id)
+
+async def update_invoice(db: AsyncSession, invoice_id: int, update_data: InvoiceUpdate) -> Invoice:
+    """Update an existing invoice."""
+    return await db.run_sync(invoice.update_invoice, invoice_id, update_data)
+
+async def delete_invoice(db: AsyncSession, invoice_id: int) -> None:
+    """Delete an invoice."""
+    return await db.run_sync(invoice.delete_invoice, invoice_id)
@@ -0,0 +1,50 @@
+from datetime import date
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from crud import order, order_stats
+from models.order import Order
+from schemas.order import OrderUpdate, OrderDetailOut
+from schemas.combined import OrderCreateCombined
+from utils.pagination import Cursor, Page
+
+async def crud_create_order(
+    db: AsyncSession,
+    order_data: OrderCreateCombined,
+    user_id: int,
+    idempotency_key: Optional[str] = None,
+    idempotency_claim: Optional[str] = None,
+) -> Order:
+    """Create a new order with all related entities in a single transaction."""
+    return await db.run_sync(order.crud_create_order, order_data, user_id, idempotency_key, idempotency_claim)
+
+async def crud_get_orders(db: AsyncSession, user_id: int) -> List[Order]:
+    """Get all orders for a user."""
+    return await db.run_sync(order.crud_get_orders, user_id)
+
+async def crud_get_order_list(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 10, cursor: Optional[Cursor] = None) -> Page:
+    """Get a page of order list rows for a user, newest first."""
+    return await db.run_sync(order.crud_get_order_list, user_id, skip, limit, cursor)
+
+async def crud_filter_orders(db: AsyncSession, user_id: int, status: Optional[str] = None, customer_name: Optional[str] = None) -> List[Order]:
+    """Filter orders based on status and customer name."""
+    return await db.run_sync(order.crud_filter_orders, user_id, status, customer_name)
+
+async def crud_update_order(db: AsyncSession, order_id: int, update_data: OrderUpdate, user_id: int) -> Order:
+    """Update an existing order."""
+    return await db.run_sync(order.crud_update_order, order_id, update_data, user_id)
+
+async def crud_get_order_by_orderNumber(db: AsyncSession, order_number: str, user_id: int) -> Optional[OrderDetailOut]:
+    """Get order details including all related models."""
+    return await db.run_sync(order.crud_get_order_by_orderNumber, order_number, user_id)
+
+async def crud_get_order_version(db: AsyncSession, order_number: str, user_id: int):
+    """(id, updated_at, newest product updated_at, line count) for an order's detail view."""
+    return await db.run_sync(order.crud_get_order_version, order_number, user_id)
+
+async def crud_delete_order(db: AsyncSession, order_id: int, user_id: int) -> None:
+    """Delete an order and its related entities."""
+    return await db.run_sync(order.crud_delete_order, order_id, user_id)
+
+async def crud_get_order_stats(db: AsyncSession, user_id: int, start: Optional[date] = None, end: Optional[date] = None) -> List[dict]:
+    """Order count and revenue per day, status and payment method, oldest day first."""
+    return await db.run_sync(order_stats.get_order_stats, user_id, start, end)
@@ -0,0 +1,8 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from crud import order_product
+from models.order_product import OrderProduct
+from schemas.order_product import OrderProductCreate
+
+async def create_order_product(db: AsyncSession, order_product_data: OrderProductCreate) -> OrderProduct:
+    """Create a new order product."""
+    return await db.run_sync(order_product.create_order_product, order_product_data)
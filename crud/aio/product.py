@@ -0,0 +1,58 @@
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from crud import product, product_search
+from models.product import Product
+from schemas.product import ProductCreate, ProductUpdate
+from utils.pagination import Cursor, Page
+
+async def create_product(db: AsyncSession, product_data: ProductCreate) -> Product:
+    """Create a new product."""
+    return await db.run_sync(product.create_product, product_data)
+
+async def get_products(db: AsyncSession, skip: int = 0, limit: int = 10, cursor: Optional[Cursor] = None) -> Page:
+    """Get a page of products, oldest first."""
+    return await db.run_sync(product.get_products, skip, limit, cursor)
+
+async def get_products_cached(db: AsyncSession, skip: int = 0, limit: int = 10, cursor: Optional[Cursor] = None) -> Page:
+    """Read-through cached get_products with serialized items."""
+    return await db.run_sync(product.get_products_cached, skip, limit, cursor)
+
+async def get_product_page_versions(db: AsyncSession, skip: int = 0, limit: int = 10, cursor: Optional[Cursor] = None) -> Page:
+    """The (id, created_at, updated_at) rows of a get_products page, without loading the products."""
+    return await db.run_sync(product.get_product_page_versions, skip, limit, cursor)
+
+async def get_product_version(db: AsyncSession, product_id: int):
+    """(id, updated_at) of a product, without loading the row."""
+    return await db.run_sync(product.get_product_version, product_id)
+
+async def get_product(db: AsyncSession, product_id: int) -> Optional[Product]:
+    """Get a single product by ID."""
+    return await db.run_sync(product.get_product, product_id)
+
+async def get_product_cached(db: AsyncSession, product_id: int) -> Optional[dict]:
+    """Read-through cached get_product returning the serialized record."""
+    return await db.run_sync(product.get_product_cached, product_id)
+
+async def load_product_record(db: AsyncSession, product_id: int) -> Optional[dict]:
+    """Fetch and serialize a product, and cache the record."""
+    return await db.run_sync(product.load_product_record, product_id)
+
+async def update_product(db: AsyncSession, product_id: int, update_data: ProductUpdate) -> Product:
+    """Update an existing product."""
+    return await db.run_sync(product.update_product, product_id, update_data)
+
+async def delete_product(db: AsyncSession, product_id: int) -> None:
+    """Delete a product."""
+    return await db.run_sync(product.delete_product, product_id)
+
+async def search_products(
+    db: AsyncSession,
+    q: str,
+    brand: Optional[str] = None,
+    collection: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    limit: int = 20,
+) -> List[Product]:
+    """Rank products matching every term of ``q`` (each term prefix-matched)."""
+    return await db.run_sync(product_search.search_products, q, brand, collection, min_price, max_price, limit)
@@ -0,0 +1,58 @@
+from sqlalchemy import column, select, table, text
+from sqlalchemy.engine import Connection
+from models.customer import Customer
+
+customers_fts = table("customers_fts", column("rowid"))
+
+# Trigram tokens let FTS5 answer substring matches from the index; a term
+# shorter than one trigram still falls back to ILIKE.
+SQLITE_CUSTOMER_SEARCH_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS customers_fts USING fts5(
+        first_name, last_name, content='customers', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS customers_fts_ai AFTER INSERT ON customers BEGIN
+        INSERT INTO customers_fts(rowid, first_name, last_name) VALUES (new.id, new.first_name, new.last_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS customers_fts_ad AFTER DELETE ON customers BEGIN
+        INSERT INTO customers_fts(customers_fts, rowid, first_name, last_name) VALUES ('delete', old.id, old.first_name, old.last_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS customers_fts_au AFTER UPDATE OF first_name, last_name ON customers BEGIN
+        INSERT INTO customers_fts(customers_fts, rowid, first_name, last_name) VALUES ('delete', old.id, old.first_name, old.last_name);
+        INSERT INTO customers_fts(rowid, first_name, last_name) VALUES (new.id, new.first_name, new.last_name);
+    END""",
+]
+
+# pg_trgm GIN indexes serve the existing ILIKE '%x%' filter directly
+POSTGRES_CUSTOMER_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_customers_first_name_trgm ON customers USING GIN (first_name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_customers_last_name_trgm ON customers USING GIN (last_name gin_trgm_ops)",
+]
+
+
+def ensure_customer_search_index(connection: Connection) -> None:
+    """Create the customer name index, building it from existing rows if new."""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'customers_fts'")
+        ).first()
+        for statement in SQLITE_CUSTOMER_SEARCH_DDL:
+            connection.execute(text(statement))
+        if not exists:
+            connection.execute(text("INSERT INTO customers_fts(customers_fts) VALUES ('rebuild')"))
+    elif dialect == "postgresql":
+        for statement in POSTGRES_CUSTOMER_SEARCH_DDL:
+            connection.execute(text(statement))
+
+
+def customer_name_filter(dialect: str, name: str):
+    """Case-insensitive substring match on first or last name, index-backed where possible."""
+    if dialect == "sqlite" and len(name) >= 3:
+        phrase = '"' + name.replace('"', '""') + '"'
+        return Customer.id.in_(
+            select(customers_fts.c.rowid).where(
+                text("customers_fts MATCH :customer_name").bindparams(customer_name=phrase)
+            )
+        )
+    return Customer.first_name.ilike(f"%{name}%") | Customer.last_name.ilike(f"%{name}%")
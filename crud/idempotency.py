@@ -0,0 +1,138 @@
+"""Idempotency keys: claim a key, store the response with the write it made, replay it.
+
+A request owns its key through a short lease. The response is written to
+the key's row in the same transaction as the data it created, so a retry
+sees either nothing (and redoes the work) or the finished response, never
+a half-done request.
+"""
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import delete, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from config import settings
+from models.idempotency_key import IdempotencyKey
+
+# Expired keys are purged by whichever request comes first after this interval
+PURGE_INTERVAL_SECONDS = 60
+_last_purge = 0.0
+
+
+def _insert(dialect: str):
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise ValueError(f"Idempotency keys are not supported on {dialect}")
+
+
+def purge_expired_keys(db: Session) -> int:
+    """Delete keys past their TTL (no commit)."""
+    return db.execute(
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.expires_at <= datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def claim_key(db: Session, user_id: int, key: str, fingerprint: str) -> Tuple[Optional[str], Optional[IdempotencyKey]]:
+    """Take ownership of ``(user_id, key)``.
+
+    Returns ``(claim, None)`` when this request now owns the key, and
+    ``(None, record)`` when another request does or already finished.
+    """
+    global _last_purge
+    try:
+        now = datetime.utcnow()
+        if time.monotonic() - _last_purge >= PURGE_INTERVAL_SECONDS:
+            _last_purge = time.monotonic()
+            purge_expired_keys(db)
+
+        claim = uuid.uuid4().hex
+        lease = now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)
+        insert = _insert(db.get_bind().dialect.name)
+        created = db.execute(
+            insert(IdempotencyKey)
+            .values(
+                user_id=user_id,
+                key=key,
+                fingerprint=fingerprint,
+                status="in_progress",
+                claim=claim,
+                locked_until=lease,
+                created_at=now,
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS),
+            )
+            .on_conflict_do_nothing(index_elements=[IdempotencyKey.user_id, IdempotencyKey.key])
+        ).rowcount
+        if not created:
+            # Take over a key whose owner died holding it, or whose TTL ran out
+            created = db.execute(
+                update(IdempotencyKey)
+                .where(
+                    IdempotencyKey.user_id == user_id,
+                    IdempotencyKey.key == key,
+                    ((IdempotencyKey.status == "in_progress") & (IdempotencyKey.locked_until <= now))
+                    | (IdempotencyKey.expires_at <= now),
+                )
+                .values(
+                    fingerprint=fingerprint,
+                    status="in_progress",
+                    claim=claim,
+                    locked_until=lease,
+                    response_status=None,
+                    response_body=None,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS),
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        db.commit()
+        if created:
+            return claim, None
+        return None, db.get(IdempotencyKey, (user_id, key), populate_existing=True)
+    except Exception as e:
+        db.rollback()
+        raise ValueError(f"Failed to claim idempotency key: {str(e)}")
+
+
+def get_key(db: Session, user_id: int, key: str) -> Optional[IdempotencyKey]:
+    """Read the current state of a key."""
+    try:
+        return db.get(IdempotencyKey, (user_id, key), populate_existing=True)
+    except Exception as e:
+        raise ValueError(f"Failed to fetch idempotency key: {str(e)}")
+
+
+def complete_key(db: Session, user_id: int, key: str, claim: str, status_code: int, body: str) -> None:
+    """Store the response in the caller's transaction (no commit).
+
+    Raises ValueError if the lease was lost, so the caller's writes roll
+    back instead of duplicating those of the request that took over.
+    """
+    stored = db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key, IdempotencyKey.claim == claim)
+        .values(status="completed", claim=None, locked_until=None, response_status=status_code, response_body=body)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if stored != 1:
+        raise ValueError("Idempotency key lease expired")
+
+
+def release_key(db: Session, user_id: int, key: str, claim: str) -> None:
+    """Give up a claimed key after a failed request, so a retry runs it again."""
+    try:
+        db.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key, IdempotencyKey.claim == claim)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise ValueError(f"Failed to release idempotency key: {str(e)}")
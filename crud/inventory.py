@@ -0,0 +1,210 @@
+"""Stock levels: atomic reservation at checkout, and optional sharded counters.
+
+Normally a product's stock lives in products.stock_quantity, so every
+checkout of that product queues on the one row lock. With
+STOCK_SHARDING_ENABLED, a hot product can have its stock split across
+rows of product_stock_shards; a checkout then decrements one random shard
+that has enough stock. For a sharded product, products.stock_quantity and
+stock_status become a cached total that refresh_sharded_stock() brings up
+to date periodically.
+"""
+from typing import Dict, List
+
+from sqlalchemy import case, delete, func, insert, literal, or_, select, update
+from sqlalchemy.orm import Session
+
+from config import settings
+from crud.product import product_cache
+from models.product import Product
+from models.product_stock_shard import ProductStockShard
+
+# Random picks to try before falling back to draining shards in order
+SHARD_PICK_ATTEMPTS = 3
+
+
+def stock_status_for(remaining, low_stock_threshold, allow_backorder):
+    """SQL expression for the stock_status matching a stock level."""
+    return case(
+        (remaining <= 0, case((allow_backorder.is_(True), "On Backorder"), else_="Out of Stock")),
+        (remaining <= func.coalesce(low_stock_threshold, 0), "Low Stock"),
+        else_="In Stock",
+    )
+
+
+def _lock_shards_for_write(db: Session, product_id: int) -> None:
+    """On SQLite, take the write lock before reading shards that will be rewritten.
+
+    SQLite ignores FOR UPDATE, and pysqlite only opens the transaction at
+    the first write, so shard rows read before then can be changed by a
+    checkout that commits in between. Any write takes SQLite's
+    database-wide lock; this one changes nothing.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(
+            update(ProductStockShard)
+            .where(ProductStockShard.product_id == product_id)
+            .values(quantity=ProductStockShard.quantity)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def _reserve_from_shards(db: Session, product_id: int, quantity: int) -> bool:
+    """Take ``quantity`` from the product's shards; False if it is not sharded."""
+    shard_row = (ProductStockShard.product_id == product_id)
+    for _ in range(SHARD_PICK_ATTEMPTS):
+        shard = db.execute(
+            select(ProductStockShard.shard)
+            .where(shard_row, ProductStockShard.quantity >= quantity)
+            .order_by(func.random())
+            .limit(1)
+        ).scalar()
+        if shard is None:
+            break
+        result = db.execute(
+            update(ProductStockShard)
+            .where(shard_row, ProductStockShard.shard == shard, ProductStockShard.quantity >= quantity)
+            .values(quantity=ProductStockShard.quantity - quantity)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            return True
+        # Another checkout drained the shard between the pick and the update
+
+    # No single shard covers the quantity: lock them all, in shard order, and
+    # take what is there
+    _lock_shards_for_write(db, product_id)
+    shards = db.execute(
+        select(ProductStockShard)
+        .where(shard_row)
+        .order_by(ProductStockShard.shard)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).scalars().all()
+    if not shards:
+        return False
+    if sum(max(shard.quantity, 0) for shard in shards) < quantity:
+        allow_backorder = db.execute(select(Product.allow_backorder).where(Product.id == product_id)).scalar()
+        if not allow_backorder:
+            raise ValueError(f"Insufficient stock for product id {product_id}")
+
+    remaining = quantity
+    for shard in shards:
+        taken = min(max(shard.quantity, 0), remaining)
+        shard.quantity -= taken
+        remaining -= taken
+    # Backordered units
+    shards[0].quantity -= remaining
+    db.flush()
+    return True
+
+
+def reserve_stock(db: Session, quantities: Dict[int, int]) -> None:
+    """Take ``quantities`` (product id -> units) out of stock in the caller's transaction.
+
+    Each product is a single conditional UPDATE, so the check and the
+    decrement happen atomically in the database and two checkouts can never
+    both take the last unit. Products are updated in id order, so orders
+    that share products lock them in the same order. Raises ValueError for
+    the first product without enough stock; the caller rolls back.
+    """
+    for product_id in sorted(quantities):
+        quantity = quantities[product_id]
+        if quantity <= 0:
+            raise ValueError(f"Quantity for product id {product_id} must be positive")
+        if settings.STOCK_SHARDING_ENABLED and _reserve_from_shards(db, product_id, quantity):
+            continue
+        stock = func.coalesce(Product.stock_quantity, 0)
+        result = db.execute(
+            update(Product)
+            .where(Product.id == product_id, or_(Product.allow_backorder.is_(True), stock >= quantity))
+            .values(
+                stock_quantity=stock - quantity,
+                stock_status=stock_status_for(stock - quantity, Product.low_stock_threshold, Product.allow_backorder),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            raise ValueError(f"Insufficient stock for product id {product_id}")
+
+
+def _write_shards(db: Session, product_id: int, total: int, shards: int) -> None:
+    db.execute(delete(ProductStockShard).where(ProductStockShard.product_id == product_id))
+    if shards > 1:
+        # Spread evenly; the first shards take the remainder
+        base, extra = divmod(total, shards)
+        db.execute(insert(ProductStockShard), [
+            {"product_id": product_id, "shard": shard, "quantity": base + (1 if shard < extra else 0)}
+            for shard in range(shards)
+        ])
+    db.execute(
+        update(Product)
+        .where(Product.id == product_id)
+        .values(
+            stock_quantity=total,
+            stock_status=stock_status_for(literal(total), Product.low_stock_threshold, Product.allow_backorder),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def set_stock_shards(db: Session, product_id: int, shards: int) -> dict:
+    """Split a product's stock across ``shards`` counters; 0 or 1 folds it back into the product row."""
+    try:
+        if not settings.STOCK_SHARDING_ENABLED:
+            raise ValueError("Stock sharding is disabled")
+        _lock_shards_for_write(db, product_id)
+        product = db.query(Product).filter(Product.id == product_id).with_for_update().first()
+        if not product:
+            raise ValueError("Product not found")
+        existing = db.execute(
+            select(ProductStockShard.quantity).where(ProductStockShard.product_id == product_id).with_for_update()
+        ).scalars().all()
+        total = sum(existing) if existing else (product.stock_quantity or 0)
+        _write_shards(db, product_id, total, shards)
+        db.commit()
+        product_cache.delete(product_id)
+        return {"product_id": product_id, "shards": shards if shards > 1 else 0, "stock_quantity": total}
+    except Exception as e:
+        db.rollback()
+        raise ValueError(f"Failed to shard product stock: {str(e)}")
+
+
+def redistribute_stock(db: Session, product_id: int, total: int) -> None:
+    """Spread a newly set stock level over a sharded product's existing shards (no commit)."""
+    shards = db.execute(
+        select(func.count()).select_from(ProductStockShard).where(ProductStockShard.product_id == product_id)
+    ).scalar_one()
+    if shards:
+        _write_shards(db, product_id, total, shards)
+
+
+def refresh_sharded_stock(db: Session) -> List[int]:
+    """Fold shard totals into products.stock_quantity / stock_status.
+
+    Only rows whose values changed are written. Returns their ids, whose
+    cached records are dropped; list pages expire on their own.
+    """
+    try:
+        total = (
+            select(func.sum(ProductStockShard.quantity))
+            .where(ProductStockShard.product_id == Product.id)
+            .scalar_subquery()
+        )
+        status = stock_status_for(total, Product.low_stock_threshold, Product.allow_backorder)
+        changed = db.execute(
+            update(Product)
+            .where(
+                Product.id.in_(select(ProductStockShard.product_id)),
+                or_(Product.stock_quantity.is_distinct_from(total), Product.stock_status.is_distinct_from(status)),
+            )
+            .values(stock_quantity=total, stock_status=status)
+            .returning(Product.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        db.commit()
+        for product_id in changed:
+            product_cache.delete(product_id)
+        return changed
+    except Exception as e:
+        db.rollback()
+        raise ValueError(f"Failed to refresh sharded stock: {str(e)}")
@@ -1,12 +1,23 @@
+from datetime import datetime
 from typing import Optional
+from sqlalchemy import String, case, cast, exists, func, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Result
 from sqlalchemy.orm import Session
+from models.customer import Customer
 from models.invoice import Invoice
+from models.order import Order, OrderStatus
 from schemas.invoice import InvoiceCreate, InvoiceUpdate
+from utils.pagination import Cursor, Page, paginate
 
 def create_invoice(db: Session, invoice_data: InvoiceCreate) -> Invoice:
     """Create a new invoice."""
     try:
-        invoice = Invoice(**invoice_data.dict())
+        values = invoice_data.dict()
+        if values.get("issued_date") is None:
+            # Let the column default stamp it
+            values.pop("issued_date", None)
+        invoice = Invoice(**values)
         db.add(invoice)
         db.commit()
         db.refresh(invoice)
@@ -15,6 +26,109 @@ def create_invoice(db: Session, invoice_data: InvoiceCreate) -> Invoice:
         db.rollback()
         raise ValueError(f"Failed to create invoice: {str(e)}")
 
+def get_invoices(db: Session, skip: int = 0, limit: int = 10, cursor: Optional[Cursor] = None) -> Page:
+    """Get a page of invoices, most recently issued first."""
+    try:
+        query = db.query(
+            Invoice.id,
+            Invoice.invoice_number.label("invoice"),
+            Invoice.customer_name,
+            Invoice.issued_date,
+            Invoice.amount,
+            Invoice.status
+        )
+        return paginate(query, Invoice.issued_date, Invoice.id, limit, skip, cursor)
+    except Exception as e:
+        raise ValueError(f"Failed to fetch invoices: {str(e)}")
+
+def export_invoices(
+    db: Session,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    status: Optional[str] = None,
+    batch_size: int = 1000,
+) -> Result:
+    """Stream invoices, oldest issued first, for export.
+
+    Returns an unbuffered result read ``batch_size`` rows at a time.
+    """
+    query = select(
+        Invoice.invoice_number,
+        Invoice.order_id,
+        Invoice.customer_name,
+        Invoice.issued_date,
+        Invoice.amount,
+        Invoice.status,
+    )
+    if start:
+        query = query.where(Invoice.issued_date >= start)
+    if end:
+        query = query.where(Invoice.issued_date < end)
+    if status:
+        query = query.where(Invoice.status == status)
+    query = query.order_by(Invoice.issued_date, Invoice.id)
+    return db.execute(query, execution_options={"stream_results": True, "yield_per": batch_size})
+
+def _invoice_number(dialect: str):
+    """SQL for f"INV-{order.id:05d}"."""
+    if dialect == "postgresql":
+        order_id = cast(Order.id, String)
+        return "INV-" + func.lpad(order_id, func.greatest(5, func.length(order_id)), "0")
+    if dialect == "sqlite":
+        return "INV-" + func.printf("%05d", Order.id)
+    raise ValueError(f"Invoice generation is not supported on {dialect}")
+
+def generate_invoices(db: Session, incremental: bool = False, since_order_id: Optional[int] = None) -> dict:
+    """Create the missing invoice of every uninvoiced order in one INSERT ... SELECT.
+
+    By default every order without an invoice is considered. ``since_order_id``
+    limits the run to newer orders; ``incremental`` uses the highest invoiced
+    order id as that watermark. Re-running is safe: orders that already have
+    an invoice, or whose invoice number is taken, are skipped.
+    """
+    try:
+        dialect = db.get_bind().dialect.name
+        if incremental and since_order_id is None:
+            since_order_id = db.execute(select(func.max(Invoice.order_id))).scalar()
+
+        now = datetime.utcnow()
+        invoice_number = _invoice_number(dialect)
+        # Orders store the enum name; invoices carry the display value
+        status = case({member.name: member.value for member in OrderStatus}, value=cast(Order.status, String))
+        source = (
+            select(
+                invoice_number,
+                func.coalesce(Customer.first_name + " " + Customer.last_name, ""),
+                func.coalesce(Order.order_date, Order.created_at),
+                Order.amount,
+                status,
+                Order.id,
+                literal(now),
+                literal(now),
+            )
+            .outerjoin(Customer, Order.customer_id == Customer.id)
+            .where(~exists().where(Invoice.order_id == Order.id))
+        )
+        if since_order_id is not None:
+            source = source.where(Order.id > since_order_id)
+
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = (
+            insert(Invoice)
+            .from_select(
+                ["invoice_number", "customer_name", "issued_date", "amount", "status", "order_id", "created_at", "updated_at"],
+                source,
+            )
+            .on_conflict_do_nothing(index_elements=[Invoice.invoice_number])
+        )
+        created = db.execute(statement).rowcount
+        db.commit()
+        watermark = db.execute(select(func.max(Invoice.order_id))).scalar()
+        return {"created": created, "watermark": watermark}
+    except Exception as e:
+        db.rollback()
+        raise ValueError(f"Failed to generate invoices: {str(e)}")
+
 def get_invoice(db: Session, invoice_id: int) -> Optional[Invoice]:
     """Get an invoice by ID."""
     try:
@@ -22,6 +136,28 @@ def get_invoice(db: Session, invoice_id: int) -> Optional[Invoice]:
     except Exception as e:
         raise ValueError(f"Failed to fetch invoice: {str(e)}")
 
+def get_invoice_summary(db: Session, invoice_id: int):
+    """An invoice as an InvoiceListOut row, plus updated_at."""
+    try:
+        return db.query(
+            Invoice.id,
+            Invoice.invoice_number.label("invoice"),
+            Invoice.customer_name,
+            Invoice.issued_date,
+            Invoice.amount,
+            Invoice.status,
+            Invoice.updated_at
+        ).filter(Invoice.id == invoice_id).first()
+    except Exception as e:
+        raise ValueError(f"Failed to fetch invoice: {str(e)}")
+
+def get_invoice_version(db: Session, invoice_id: int):
+    """(id, updated_at) of an invoice, without loading the row."""
+    try:
+        return db.query(Invoice.id, Invoice.updated_at).filter(Invoice.id == invoice_id).first()
+    except Exception as e:
+        raise ValueError(f"Failed to fetch invoice version: {str(e)}")
+
 def get_invoice_by_order(db: Session, order_id: int) -> Optional[Invoice]:
     """Get invoice by order ID."""
     try:
@@ -1,26 +1,38 @@
 from typing import List, Optional
+from sqlalchemy.engine import Result
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session
-from crud.customer import create_customer
 from models.order import Order, Customer, Address, OrderProduct
 from models.product import Product
 from models.order import Order, Customer, Address, OrderProduct, OrderStatus
-from schemas.order import OrderCreate, OrderUpdate, OrderDetailOut
+from schemas.order import OrderCreate, OrderUpdate, OrderDetailOut, OrderOut
 from models.invoice import Invoice
 from schemas.combined import OrderCreateCombined
+from crud.customer_search import customer_name_filter
+from crud.idempotency import complete_key
+from crud.inventory import reserve_stock
+from crud.product import product_cache
+from crud.order_stats import record_order
+from crud.sequence import BlockAllocator
+from utils.pagination import Cursor, Page, paginate
+from config import settings
 from datetime import datetime
 from sqlalchemy.orm import joinedload
 
+order_number_allocator = BlockAllocator(
+    "order_number",
+    settings.ORDER_NUMBER_BLOCK_SIZE,
+    initial_value=lambda conn: conn.execute(select(func.coalesce(func.max(Order.id), 0))).scalar_one() + 1
+)
+
 def crud_get_order_number(db: Session) -> str:
-    """Generate a unique order number."""
+    """Generate a unique order number.
+
+    Must be called before the session starts writing: on SQLite a block
+    reservation opens its own write transaction.
+    """
     try:
-               
-        last_order = db.query(Order).order_by(Order.id.desc()).first()
-        if last_order:
-            last_id = last_order.id
-        else:
-            last_id = 0
-        
-        return f"ORD-{last_id + 1:05d}"
+        return f"ORD-{order_number_allocator.next_value(db.get_bind().engine):05d}"
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -30,32 +42,75 @@ def crud_get_order_number(db: Session) -> str:
 from models.order import Order, Customer, Address, OrderProduct, OrderStatus
 
 def crud_create_customer(db: Session, customer_data: dict) -> Customer:
-    """Create a new customer if they don't exist."""
+    """Get or create a customer inside the caller's transaction (flush, no commit)."""
     try:
         customer = db.query(Customer).filter(Customer.email == customer_data['email']).first()
         if not customer:
             customer = Customer(**customer_data)
             db.add(customer)
-            db.commit()
-            db.refresh(customer)
+            db.flush()
         return customer
     except Exception as e:
         raise ValueError(f"Failed to create customer: {str(e)}")
 
 
 
-def crud_create_order(db: Session, order_data: OrderCreateCombined, user_id: int) -> Order:
-    """Create a new order with all related entities."""
-    try:
-        # Create or get customer
-        customer = create_customer(db, order_data.customer)
+def crud_create_order(
+    db: Session,
+    order_data: OrderCreateCombined,
+    user_id: int,
+    idempotency_key: Optional[str] = None,
+    idempotency_claim: Optional[str] = None,
+) -> Order:
+    """Create a new order with all related entities in a single transaction.
 
-        # Generate order number
+    With an idempotency key, the OrderOut response is stored on the key in
+    the same transaction.
+    """
+    try:
+        # Allocate first, while this session holds no connection: a block
+        # refill checks out a second one, which could starve a full pool
         order_number = crud_get_order_number(db)
 
+        # Load every referenced product with one IN query
+        product_ids = {item.product_id for item in order_data.products}
+        products = {
+            product.id: product
+            for product in db.query(Product).filter(Product.id.in_(product_ids)).all()
+        }
+        missing = sorted(product_ids - products.keys())
+        if missing:
+            raise ValueError(f"Product id {missing[0]} not found")
+
+        # Price the line items in memory
+        line_items = []
+        quantities = {}
+        total_amount = 0.0
+        for item in order_data.products:
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+            product = products[item.product_id]
+            price = product.sale_price if product.sale_price is not None else product.regular_price
+            subtotal = (price * item.quantity) - (item.discount or 0)
+            if subtotal < 0:
+                subtotal = 0
+
+            line_items.append({
+                "product_id": product.id,
+                "quantity": item.quantity,
+                "discount": item.discount or 0,
+                "subtotal": subtotal
+            })
+            total_amount += subtotal
+
+        # Conditional decrements in this transaction: they commit or roll
+        # back with the order, and a sold-out item fails it before anything
+        # else is written
+        reserve_stock(db, quantities)
 
+        # Create or get customer
+        customer = crud_create_customer(db, order_data.customer.dict())
 
-        # Create order
+        # Create order; flush to get its id without committing
         order = Order(
             order_number=order_number,
             customer_id=customer.id,
@@ -63,11 +118,11 @@ def crud_create_order(db: Session, order_data: OrderCreateCombined, user_id: int
             payment_method=order_data.payment_method,
             status=OrderStatus.PENDING,
             user_id=user_id,
-            amount=0.0
+            amount=total_amount
         )
         db.add(order)
-        db.commit()
-        db.refresh(order)
+        db.flush()
+        record_order(db, order)
 
         # Create shipping address
         shipping_address = Address(
@@ -80,31 +135,21 @@ def crud_create_order(db: Session, order_data: OrderCreateCombined, user_id: int
             order_id=order.id
         )
         db.add(shipping_address)
+        db.flush()
 
-        # Add products and calculate total
-        total_amount = 0.0
-        for item in order_data.products:
-            product = db.query(Product).filter(Product.id == item.product_id).first()
-            if not product:
-                raise ValueError(f"Product id {item.product_id} not found")
-            
-            price = product.sale_price if product.sale_price is not None else product.regular_price
-            subtotal = (price * item.quantity) - (item.discount or 0)
-            if subtotal < 0:
-                subtotal = 0
-            
-            order_product = OrderProduct(
-                order_id=order.id,
-                product_id=product.id,
-                quantity=item.quantity,
-                discount=item.discount or 0,
-                subtotal=subtotal
-            )
-            db.add(order_product)
-            total_amount += subtotal
+        # Bulk insert the line items in one executemany
+        for line_item in line_items:
+            line_item["order_id"] = order.id
+        db.execute(insert(OrderProduct), line_items)
+
+        if idempotency_key:
+            complete_key(db, user_id, idempotency_key, idempotency_claim, 201, OrderOut.model_validate(order).model_dump_json())
 
-        order.amount = total_amount
         db.commit()
+        # List pages are left to expire: clearing them on every checkout
+        # would empty the list cache during a sale
+        for product_id in quantities:
+            product_cache.delete(product_id)
         db.refresh(order)
         return order
     except Exception as e:
@@ -120,6 +165,67 @@ def crud_get_orders(db: Session, user_id: int) -> List[Order]:
     except Exception as e:
         raise ValueError(f"Failed to fetch orders: {str(e)}")
 
+def crud_get_order_list(db: Session, user_id: int, skip: int = 0, limit: int = 10, cursor: Optional[Cursor] = None) -> Page:
+    """Get a page of order list rows for a user, newest first.
+
+    Selects only the OrderListOut columns with the customer name joined in
+    SQL, so no Order or Customer entities are loaded per row.
+    """
+    try:
+        query = (
+            db.query(
+                Order.id,
+                Order.created_at,
+                Order.order_number.label("invoice"),
+                func.coalesce(Customer.first_name + " " + Customer.last_name, "").label("customer_name"),
+                Order.created_at.label("order_date"),
+                Order.amount,
+                Order.payment_method,
+                Order.status
+            )
+            .outerjoin(Customer, Order.customer_id == Customer.id)
+            .filter(Order.user_id == user_id)
+        )
+        return paginate(query, Order.created_at, Order.id, limit, skip, cursor)
+    except Exception as e:
+        raise ValueError(f"Failed to fetch orders: {str(e)}")
+
+def crud_export_orders(
+    db: Session,
+    user_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    status: Optional[OrderStatus] = None,
+    batch_size: int = 1000,
+) -> Result:
+    """Stream a user's orders, oldest first, for export.
+
+    Returns an unbuffered result: rows are fetched from a server-side cursor
+    ``batch_size`` at a time, so memory stays flat however many match.
+    """
+    query = (
+        select(
+            Order.order_number,
+            Order.order_date,
+            Order.created_at,
+            func.coalesce(Customer.first_name + " " + Customer.last_name, "").label("customer_name"),
+            Customer.email.label("customer_email"),
+            Order.amount,
+            Order.payment_method,
+            Order.status,
+        )
+        .outerjoin(Customer, Order.customer_id == Customer.id)
+        .where(Order.user_id == user_id)
+    )
+    if start:
+        query = query.where(Order.created_at >= start)
+    if end:
+        query = query.where(Order.created_at < end)
+    if status:
+        query = query.where(Order.status == status)
+    query = query.order_by(Order.created_at, Order.id)
+    return db.execute(query, execution_options={"stream_results": True, "yield_per": batch_size})
+
 def crud_filter_orders(db: Session, user_id: int, status: Optional[str] = None, customer_name: Optional[str] = None) -> List[Order]:
     """Filter orders based on status and customer name."""
     try:
@@ -128,10 +234,9 @@ def crud_filter_orders(db: Session, user_id: int, status: Optional[str] = None,
             query = query.filter(Order.status == status)
         if customer_name:
             query = query.join(Customer).filter(
-                (Customer.first_name.ilike(f"%{customer_name}%")) |
-                (Customer.last_name.ilike(f"%{customer_name}%"))
+                customer_name_filter(db.get_bind().dialect.name, customer_name)
             )
-        return query.all()
+        return query.order_by(Order.created_at.desc()).all()
     except Exception as e:
         raise ValueError(f"Failed to filter orders: {str(e)}")
 
@@ -142,8 +247,12 @@ def crud_update_order(db: Session, order_id: int, update_data: OrderUpdate, user
         if not order:
             raise ValueError("Order not found")
         
+        # Move the order between stats buckets in the same transaction
+        record_order(db, order, -1)
         for key, value in update_data.dict(exclude_unset=True).items():
             setattr(order, key, value)
+        db.flush()
+        record_order(db, order)
         
         db.commit()
         db.refresh(order)
@@ -170,7 +279,27 @@ def crud_get_order_by_orderNumber(db: Session, order_number: str, user_id: int):
     if not order:
         return None
 
-    return OrderDetailOut.from_orm(order)
+    return OrderDetailOut.model_validate(order)
+
+
+def crud_get_order_version(db: Session, order_number: str, user_id: int):
+    """(id, updated_at, newest product updated_at, line count) for an order's detail view.
+
+    One aggregate over indexed columns; nothing is loaded or serialized.
+    Customer and address rows carry no timestamp, so edits to them alone
+    do not change the version.
+    """
+    try:
+        return (
+            db.query(Order.id, Order.updated_at, func.max(Product.updated_at), func.count(OrderProduct.id))
+            .outerjoin(OrderProduct, OrderProduct.order_id == Order.id)
+            .outerjoin(Product, Product.id == OrderProduct.product_id)
+            .filter(Order.order_number == order_number, Order.user_id == user_id)
+            .group_by(Order.id, Order.updated_at)
+            .first()
+        )
+    except Exception as e:
+        raise ValueError(f"Failed to fetch order version: {str(e)}")
 
 
 def crud_delete_order(db: Session, order_id: int, user_id: int) -> None:
@@ -183,6 +312,7 @@ def crud_delete_order(db: Session, order_id: int, user_id: int) -> None:
         # Delete related entities
         db.query(OrderProduct).filter(OrderProduct.order_id == order_id).delete()
         db.query(Address).filter(Address.order_id == order_id).delete()
+        record_order(db, order, -1)
         db.delete(order)
         db.commit()
     except Exception as e:
@@ -0,0 +1,95 @@
+from datetime import date
+from typing import List, Optional, Union
+from sqlalchemy import Date, cast, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from models.order import Order
+from models.order_stat import OrderStat
+
+def _bucket(order: Order) -> dict:
+    day = order.order_date or order.created_at
+    return {
+        "user_id": order.user_id,
+        "day": day.date(),
+        "status": order.status,
+        "payment_method": order.payment_method or "",
+    }
+
+def record_order(db: Session, order: Order, sign: int = 1) -> None:
+    """Add (sign=1) or remove (sign=-1) ``order`` from its stats bucket.
+
+    Runs in the caller's transaction; call it before the caller commits.
+    The increment is a single upsert, so concurrent writers never lose counts.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        raise ValueError(f"Order stats are not supported on {dialect}")
+    upsert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+    bucket = _bucket(order)
+    statement = upsert(OrderStat).values(**bucket, order_count=sign, revenue=sign * (order.amount or 0.0))
+    db.execute(statement.on_conflict_do_update(
+        index_elements=list(bucket),
+        set_={
+            "order_count": OrderStat.order_count + statement.excluded.order_count,
+            "revenue": OrderStat.revenue + statement.excluded.revenue,
+        },
+    ))
+    if sign < 0:
+        db.execute(
+            delete(OrderStat)
+            .where(*(getattr(OrderStat, key) == value for key, value in bucket.items()))
+            .where(OrderStat.order_count <= 0)
+        )
+
+def rebuild_order_stats(db: Union[Session, Connection]) -> int:
+    """Recompute every bucket from the orders table; returns the bucket count.
+
+    Commits when given a Session; a Connection is left to its caller's
+    transaction (migrations run it inside theirs).
+    """
+    dialect = db.get_bind().dialect.name if isinstance(db, Session) else db.dialect.name
+    # SQLite's CAST(... AS DATE) yields a number; date() yields the ISO day
+    day = func.date(func.coalesce(Order.order_date, Order.created_at)) if dialect == "sqlite" \
+        else cast(func.coalesce(Order.order_date, Order.created_at), Date)
+    payment_method = func.coalesce(Order.payment_method, "")
+    source = (
+        select(Order.user_id, day, Order.status, payment_method, func.count(), func.coalesce(func.sum(Order.amount), 0.0))
+        .where(Order.user_id.is_not(None))
+        .group_by(Order.user_id, day, Order.status, payment_method)
+    )
+    try:
+        db.execute(delete(OrderStat))
+        db.execute(insert(OrderStat).from_select(
+            ["user_id", "day", "status", "payment_method", "order_count", "revenue"], source
+        ))
+        count = db.execute(select(func.count()).select_from(OrderStat)).scalar_one()
+        if isinstance(db, Session):
+            db.commit()
+        return count
+    except Exception as e:
+        if isinstance(db, Session):
+            db.rollback()
+        raise ValueError(f"Failed to rebuild order stats: {str(e)}")
+
+def get_order_stats(db: Session, user_id: int, start: Optional[date] = None, end: Optional[date] = None) -> List[dict]:
+    """Order count and revenue per day, status and payment method, oldest day first."""
+    try:
+        query = db.query(OrderStat).filter(OrderStat.user_id == user_id)
+        if start:
+            query = query.filter(OrderStat.day >= start)
+        if end:
+            query = query.filter(OrderStat.day <= end)
+        return [
+            {
+                "day": stat.day,
+                "status": stat.status.value,
+                "payment_method": stat.payment_method or None,
+                "order_count": stat.order_count,
+                "revenue": stat.revenue,
+            }
+            for stat in query.order_by(OrderStat.day, OrderStat.status, OrderStat.payment_method)
+        ]
+    except Exception as e:
+        raise ValueError(f"Failed to fetch order stats: {str(e)}")
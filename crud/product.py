@@ -1,7 +1,25 @@
-from typing import List, Optional
+from typing import Iterable, Optional
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
+from config import settings
 from models.product import Product
 from schemas.product import ProductCreate, ProductUpdate
+from utils.cache import make_cache
+from utils.pagination import Cursor, Page, paginate
+
+# Serialized product records by id, and serialized list pages by page key
+product_cache = make_cache("product", settings.PRODUCT_CACHE_MAX_SIZE, settings.PRODUCT_CACHE_TTL_SECONDS)
+product_list_cache = make_cache("products", settings.PRODUCT_CACHE_MAX_SIZE, settings.PRODUCT_CACHE_TTL_SECONDS)
+
+def serialize_product(product: Product) -> dict:
+    """JSON-ready dict of a product's columns."""
+    return jsonable_encoder({column.key: getattr(product, column.key) for column in Product.__table__.columns})
+
+def invalidate_products(product_ids: Iterable[int] = ()) -> None:
+    """Drop cached records for ``product_ids`` and every cached list page."""
+    for product_id in product_ids:
+        product_cache.delete(product_id)
+    product_list_cache.clear()
 
 def create_product(db: Session, product_data: ProductCreate) -> Product:
     """Create a new product."""
@@ -15,18 +33,49 @@ def create_product(db: Session, product_data: ProductCreate) -> Product:
         db.add(product)
         db.commit()
         db.refresh(product)
+        invalidate_products()
         return product
     except Exception as e:
         db.rollback()
         raise ValueError(f"Failed to create product: {str(e)}")
 
-def get_products(db: Session, skip: int = 0, limit: int = 10) -> List[Product]:
-    """Get list of products with pagination."""
+def get_products(db: Session, skip: int = 0, limit: int = 10, cursor: Optional[Cursor] = None) -> Page:
+    """Get a page of products, oldest first."""
     try:
-        return db.query(Product).offset(skip).limit(limit).all()
+        return paginate(db.query(Product), Product.created_at, Product.id, limit, skip, cursor, descending=False)
     except Exception as e:
         raise ValueError(f"Failed to fetch products: {str(e)}")
 
+def get_product_page_versions(db: Session, skip: int = 0, limit: int = 10, cursor: Optional[Cursor] = None) -> Page:
+    """The (id, created_at, updated_at) rows of a get_products page, without loading the products."""
+    try:
+        query = db.query(Product.id, Product.created_at, Product.updated_at)
+        return paginate(query, Product.created_at, Product.id, limit, skip, cursor, descending=False)
+    except Exception as e:
+        raise ValueError(f"Failed to fetch product versions: {str(e)}")
+
+def _page_key(skip: int, limit: int, cursor: Optional[Cursor]) -> str:
+    return f"{skip}:{limit}:{tuple(cursor) if cursor else ''}"
+
+def peek_products_cached(skip: int = 0, limit: int = 10, cursor: Optional[Cursor] = None) -> Optional[Page]:
+    """The cached get_products page, if there is one; never queries."""
+    cached = product_list_cache.get(_page_key(skip, limit, cursor))
+    return Page(*cached) if cached is not None else None
+
+def get_products_cached(db: Session, skip: int = 0, limit: int = 10, cursor: Optional[Cursor] = None) -> Page:
+    """Read-through cached get_products with serialized items."""
+    cached = peek_products_cached(skip, limit, cursor)
+    if cached is not None:
+        return cached
+
+    key = _page_key(skip, limit, cursor)
+    # Read before the query: a write that lands meanwhile invalidates the page
+    generation = product_list_cache.generation(key)
+    page = get_products(db, skip, limit, cursor)
+    page = Page([serialize_product(product) for product in page.items], page.next_cursor, page.prev_cursor)
+    product_list_cache.set(key, list(page), generation=generation)
+    return page
+
 def get_product(db: Session, product_id: int) -> Optional[Product]:
     """Get a single product by ID."""
     try:
@@ -34,6 +83,34 @@ def get_product(db: Session, product_id: int) -> Optional[Product]:
     except Exception as e:
         raise ValueError(f"Failed to fetch product: {str(e)}")
 
+def get_product_version(db: Session, product_id: int):
+    """(id, updated_at) of a product, without loading the row."""
+    try:
+        return db.query(Product.id, Product.updated_at).filter(Product.id == product_id).first()
+    except Exception as e:
+        raise ValueError(f"Failed to fetch product version: {str(e)}")
+
+def get_product_cached(db: Session, product_id: int) -> Optional[dict]:
+    """Read-through cached get_product returning the serialized record."""
+    cached = product_cache.get(product_id)
+    if cached is not None:
+        return cached
+    return load_product_record(db, product_id)
+
+def load_product_record(db: Session, product_id: int) -> Optional[dict]:
+    """Fetch and serialize a product, and cache the record.
+
+    The record is not cached if the product was invalidated while it was
+    being loaded, since it may predate that write.
+    """
+    generation = product_cache.generation(product_id)
+    product = get_product(db, product_id)
+    if product is None:
+        return None
+    record = serialize_product(product)
+    product_cache.set(product_id, record, generation=generation)
+    return record
+
 def update_product(db: Session, product_id: int, update_data: ProductUpdate) -> Product:
     """Update an existing product."""
     try:
@@ -41,11 +118,18 @@ def update_product(db: Session, product_id: int, update_data: ProductUpdate) ->
         if not product:
             raise ValueError("Product not found")
         
-        for key, value in update_data.dict(exclude_unset=True).items():
+        updates = update_data.dict(exclude_unset=True)
+        for key, value in updates.items():
             setattr(product, key, value)
+        if "stock_quantity" in updates and settings.STOCK_SHARDING_ENABLED:
+            # crud.inventory imports this module
+            from crud.inventory import redistribute_stock
+            db.flush()
+            redistribute_stock(db, product_id, product.stock_quantity or 0)
         
         db.commit()
         db.refresh(product)
+        invalidate_products([product_id])
         return product
     except Exception as e:
         db.rollback()
@@ -60,6 +144,7 @@ def delete_product(db: Session, product_id: int) -> None:
         
         db.delete(product)
         db.commit()
+        invalidate_products([product_id])
     except Exception as e:
         db.rollback()
         raise ValueError(f"Failed to delete product: {str(e)}")
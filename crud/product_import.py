@@ -0,0 +1,177 @@
+"""Bulk product import: validate rows in chunks and upsert them on permalink.
+
+Rows arrive as JSON Lines or CSV (first line is the header). Each row is
+treated as a full product record, like PUT: columns it leaves out get the
+ProductCreate defaults. Invalid rows are reported and skipped; they never
+abort the rest of the import.
+"""
+import codecs
+import csv
+import json
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from config import settings
+from crud.inventory import redistribute_stock
+from crud.product import product_cache, product_list_cache
+from crud.product_search import batched_search_index
+from models.product import Product
+from models.product_stock_shard import ProductStockShard
+from schemas.product import ProductCreate
+
+FORMATS = ("jsonl", "csv")
+
+# Never overwritten on conflict
+PRESERVED_COLUMNS = {"id", "permalink", "created_at"}
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Split a stream of UTF-8 byte chunks into lines, keeping line endings.
+
+    Only "\n" ends a line ("\r\n" keeps its "\r", as with newline=""):
+    str.splitlines also breaks on U+2028, \x85 and other characters that
+    may appear unescaped inside a JSON string.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        # The last piece may be an incomplete line
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def iter_rows(lines: Iterable[str], format: str) -> Iterator[Tuple[int, object]]:
+    """Yield ``(row_number, raw_row)``; a raw row is a dict or a parse error message."""
+    if format == "csv":
+        reader = csv.DictReader(lines)
+        for number, row in enumerate(reader, start=1):
+            # Empty cells mean "use the default", not an empty string
+            yield number, {key: value for key, value in row.items() if key and value != ""}
+        return
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, f"Invalid JSON: {e.msg}"
+            continue
+        yield number, row if isinstance(row, dict) else "Expected a JSON object"
+
+
+def _upsert_statement(dialect: str):
+    if dialect == "postgresql":
+        insert = postgresql.insert
+    elif dialect == "sqlite":
+        insert = sqlite.insert
+    else:
+        raise ValueError(f"Bulk import is not supported on {dialect}")
+
+    statement = insert(Product)
+    updates = {
+        column.name: statement.excluded[column.name]
+        for column in Product.__table__.columns
+        if column.name not in PRESERVED_COLUMNS
+    }
+    updates["updated_at"] = datetime.utcnow()
+    return statement.on_conflict_do_update(index_elements=[Product.permalink], set_=updates)
+
+
+def _redistribute_sharded_stock(db: Session, permalinks: List[str]) -> None:
+    """Spread the imported stock of sharded products over their shards (no commit).
+
+    The upsert sets products.stock_quantity directly, which for a sharded
+    product is only a cached total: the next refresh would put the old
+    shard total back.
+    """
+    if not settings.STOCK_SHARDING_ENABLED:
+        return
+    sharded = db.execute(
+        select(Product.id, Product.stock_quantity)
+        .where(Product.permalink.in_(permalinks), Product.id.in_(select(ProductStockShard.product_id)))
+    ).all()
+    for product_id, stock_quantity in sharded:
+        redistribute_stock(db, product_id, stock_quantity or 0)
+
+
+def _write_chunk(db: Session, chunk: Dict[str, Tuple[int, dict]], errors: List[dict]) -> int:
+    """Upsert one chunk in a transaction, retrying row by row if it fails."""
+    statement = _upsert_statement(db.get_bind().dialect.name)
+    try:
+        connection = db.connection()
+        with batched_search_index(connection, list(chunk)):
+            # Core executemany; the ORM bulk path adds per-row overhead for nothing
+            connection.execute(statement, [values for _, values in chunk.values()])
+        _redistribute_sharded_stock(db, list(chunk))
+        db.commit()
+        return len(chunk)
+    except Exception:
+        db.rollback()
+
+    written = 0
+    for number, values in chunk.values():
+        try:
+            db.connection().execute(statement, [values])
+            _redistribute_sharded_stock(db, [values["permalink"]])
+            db.commit()
+            written += 1
+        except Exception as e:
+            db.rollback()
+            errors.append({"row": number, "permalink": values["permalink"], "errors": [{"msg": str(e.__cause__ or e)}]})
+    return written
+
+
+def import_products(db: Session, lines: Iterable[str], format: str = "jsonl", chunk_size: int = 1000) -> dict:
+    """Validate and upsert products from JSONL or CSV lines.
+
+    Returns counts and the per-row errors. Rows are committed a chunk at a
+    time, so an import that dies midway keeps the chunks already written.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported format: {format}")
+
+    received = upserted = 0
+    errors: List[dict] = []
+    # Keyed by permalink: a repeated permalink within a chunk keeps the last row
+    chunk: Dict[str, Tuple[int, dict]] = {}
+
+    try:
+        for number, row in iter_rows(lines, format):
+            received += 1
+            if isinstance(row, str):
+                errors.append({"row": number, "errors": [{"msg": row}]})
+                continue
+            try:
+                values = ProductCreate.model_validate(row).model_dump()
+            except ValidationError as e:
+                errors.append({
+                    "row": number,
+                    "permalink": row.get("permalink"),
+                    "errors": [{"loc": list(error["loc"]), "msg": error["msg"]} for error in e.errors()],
+                })
+                continue
+            chunk[values["permalink"]] = (number, values)
+            if len(chunk) >= chunk_size:
+                upserted += _write_chunk(db, chunk, errors)
+                chunk = {}
+        if chunk:
+            upserted += _write_chunk(db, chunk, errors)
+    finally:
+        if upserted:
+            product_cache.clear()
+            product_list_cache.clear()
+
+    errors.sort(key=lambda error: error["row"])
+    return {"received": received, "upserted": upserted, "failed": len(errors), "errors": errors}
@@ -0,0 +1,150 @@
+import re
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Sequence
+from sqlalchemy import bindparam, column, func, literal_column, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from models.product import Product
+
+SEARCH_COLUMNS = ("product_name", "description", "brand", "collection", "seo_keywords", "sku")
+# bm25 weights, in SEARCH_COLUMNS order: a name or SKU hit outranks a description hit
+SEARCH_WEIGHTS = (10.0, 1.0, 4.0, 4.0, 2.0, 8.0)
+
+products_fts = table("products_fts", column("rowid"))
+
+_columns = ", ".join(SEARCH_COLUMNS)
+_new_values = ", ".join(f"new.{column}" for column in SEARCH_COLUMNS)
+_old_values = ", ".join(f"old.{column}" for column in SEARCH_COLUMNS)
+_pg_document = " || ' ' || ".join(f"coalesce({column}, '')" for column in SEARCH_COLUMNS)
+
+SQLITE_INSERT_TRIGGER = f"""CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END"""
+# Only reindex when a searchable column changes, not on stock or price updates
+SQLITE_UPDATE_TRIGGER = f"""CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF {_columns} ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+        INSERT INTO products_fts(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END"""
+
+SQLITE_SEARCH_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        {_columns}, content='products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    SQLITE_INSERT_TRIGGER,
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+    END""",
+    SQLITE_UPDATE_TRIGGER,
+]
+
+POSTGRES_SEARCH_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_products_search ON products USING GIN (to_tsvector('simple', {_pg_document}))",
+]
+
+
+def ensure_search_index(connection: Connection) -> None:
+    """Create the product full-text index, building it from existing rows if new."""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'")
+        ).first()
+        for statement in SQLITE_SEARCH_DDL:
+            connection.execute(text(statement))
+        if not exists:
+            connection.execute(text("INSERT INTO products_fts(products_fts) VALUES ('rebuild')"))
+    elif dialect == "postgresql":
+        for statement in POSTGRES_SEARCH_DDL:
+            connection.execute(text(statement))
+
+
+@contextmanager
+def batched_search_index(connection: Connection, permalinks: Sequence[str]) -> Iterator[None]:
+    """Index a batch of product upserts set-based instead of row by row.
+
+    Wrap the upsert of the products with ``permalinks``. On SQLite the
+    insert/update triggers are dropped for the duration and the batch's
+    index entries are replaced with two INSERT ... SELECTs, which is several
+    times cheaper than the per-row triggers. Everything happens in the
+    caller's transaction, so a failure leaves the triggers in place.
+    PostgreSQL maintains its GIN index itself; nothing to do there.
+    """
+    if connection.dialect.name != "sqlite":
+        yield
+        return
+
+    batch = {"permalinks": list(permalinks)}
+    in_batch = "FROM products WHERE permalink IN :permalinks"
+    # DML first: pysqlite only opens its transaction before DML, and DDL run
+    # outside one would commit on its own and outlive a rollback
+    connection.execute(
+        text(f"INSERT INTO products_fts(products_fts, rowid, {_columns}) SELECT 'delete', id, {_columns} {in_batch}")
+        .bindparams(bindparam("permalinks", expanding=True)),
+        batch,
+    )
+    connection.execute(text("DROP TRIGGER IF EXISTS products_fts_ai"))
+    connection.execute(text("DROP TRIGGER IF EXISTS products_fts_au"))
+    yield
+    connection.execute(
+        text(f"INSERT INTO products_fts(rowid, {_columns}) SELECT id, {_columns} {in_batch}")
+        .bindparams(bindparam("permalinks", expanding=True)),
+        batch,
+    )
+    connection.execute(text(SQLITE_INSERT_TRIGGER))
+    connection.execute(text(SQLITE_UPDATE_TRIGGER))
+
+
+def _terms(q: str) -> List[str]:
+    return re.findall(r"\w+", q.lower())
+
+
+def search_products(
+    db: Session,
+    q: str,
+    brand: Optional[str] = None,
+    collection: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    limit: int = 20,
+) -> List[Product]:
+    """Rank products matching every term of ``q`` (each term prefix-matched)."""
+    try:
+        terms = _terms(q)
+        if not terms:
+            return []
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "sqlite":
+            weights = ", ".join(str(weight) for weight in SEARCH_WEIGHTS)
+            rank = literal_column(f"bm25(products_fts, {weights})")
+            query = (
+                db.query(Product)
+                .join(products_fts, products_fts.c.rowid == Product.id)
+                .filter(text("products_fts MATCH :match"))
+                .params(match=" ".join(f'"{term}"*' for term in terms))
+                .order_by(rank)
+            )
+        elif dialect == "postgresql":
+            document = func.to_tsvector("simple", literal_column(_pg_document))
+            tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+            query = (
+                db.query(Product)
+                .filter(document.op("@@")(tsquery))
+                .order_by(func.ts_rank(document, tsquery).desc())
+            )
+        else:
+            raise ValueError(f"Full-text search is not supported on {dialect}")
+
+        price = func.coalesce(Product.sale_price, Product.regular_price)
+        if brand:
+            query = query.filter(Product.brand == brand)
+        if collection:
+            query = query.filter(Product.collection == collection)
+        if min_price is not None:
+            query = query.filter(price >= min_price)
+        if max_price is not None:
+            query = query.filter(price <= max_price)
+        return query.limit(limit).all()
+    except Exception as e:
+        raise ValueError(f"Failed to search products: {str(e)}")
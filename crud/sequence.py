@@ -0,0 +1,77 @@
+import threading
+from typing import Callable, List, Tuple
+from sqlalchemy import insert, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from models.sequence import Sequence
+
+
+class BlockAllocator:
+    """Hand out sequence values from blocks reserved in the ``sequences`` table.
+
+    Each process reserves ``block_size`` values at a time with a single atomic
+    ``UPDATE``, so concurrent workers never receive the same value and most
+    calls are served from memory. Values are unique but not strictly ordered
+    across workers, and the unused part of a block is skipped on restart.
+    """
+
+    def __init__(self, name: str, block_size: int, initial_value: Callable[[Connection], int]):
+        self.name = name
+        self.block_size = max(1, block_size)
+        self.initial_value = initial_value
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+        self._spare: List[Tuple[int, int]] = []
+
+    def next_value(self, engine: Engine) -> int:
+        """Return the next value, reserving a new block when the current one runs out."""
+        with self._lock:
+            value = self._take()
+            if value is not None:
+                return value
+
+        # Reserve outside the lock so other callers are never blocked on I/O
+        start, end = self._reserve_block(engine)
+        with self._lock:
+            if self._next >= self._end:
+                self._next, self._end = start + 1, end
+            else:
+                self._spare.append((start + 1, end))
+        return start
+
+    def _take(self):
+        if self._next >= self._end and self._spare:
+            self._next, self._end = self._spare.pop()
+        if self._next < self._end:
+            value = self._next
+            self._next += 1
+            return value
+        return None
+
+    def _reserve_block(self, engine: Engine) -> Tuple[int, int]:
+        # Runs on its own connection and commits immediately, so the row lock is
+        # held only for this statement and not for the caller's transaction.
+        for _ in range(3):
+            try:
+                with engine.begin() as conn:
+                    result = conn.execute(
+                        update(Sequence)
+                        .where(Sequence.name == self.name)
+                        .values(next_value=Sequence.next_value + self.block_size)
+                    )
+                    if result.rowcount:
+                        end = conn.execute(
+                            select(Sequence.next_value).where(Sequence.name == self.name)
+                        ).scalar_one()
+                        return end - self.block_size, end
+
+                    start = self.initial_value(conn)
+                    conn.execute(
+                        insert(Sequence).values(name=self.name, next_value=start + self.block_size)
+                    )
+                    return start, start + self.block_size
+            except IntegrityError:
+                # Another worker created the row first; retry the update
+                continue
+        raise ValueError(f"Failed to reserve a block for sequence {self.name}")
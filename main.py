@@ -1,17 +1,21 @@
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
 from config import settings
 from database import Base, SessionLocal, engine
 from models.user import User
 from models.order import Order, OrderStatus
-from routers import auth, order, customer, invoice, address, order_product, product
+from utils.email_service import email_worker
+from utils.stock_refresher import stock_refresher
+from utils.password import hash_password_blocking
+from migrations import run_migrations
+from routers import auth, order, customer, invoice, address, order_product, product, metrics
 
 Base.metadata.create_all(bind=engine)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# create_all skips indexes and triggers on tables that already exist
+run_migrations(engine)
 
 def create_admin_user():
     db = SessionLocal()
@@ -23,7 +27,7 @@ def create_admin_user():
             return
 
         # Create new admin user
-        hashed_password = pwd_context.hash(settings.ADMIN_PASSWORD)
+        hashed_password = hash_password_blocking(settings.ADMIN_PASSWORD)
         admin = User(
             email=settings.ADMIN_EMAIL,
             name=settings.ADMIN_NAME,
@@ -47,9 +51,14 @@ def create_admin_user():
 async def lifespan(app: FastAPI):
     # Startup
     create_admin_user()
+    if settings.EMAIL_WORKER_ENABLED:
+        email_worker.start()
+    if settings.STOCK_SHARDING_ENABLED:
+        stock_refresher.start()
     yield
     # Shutdown
-    pass
+    await stock_refresher.stop()
+    await email_worker.stop()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -60,6 +69,7 @@ app.include_router(invoice.router)
 app.include_router(address.router)
 app.include_router(order_product.router)
 app.include_router(product.router)
+app.include_router(metrics.router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,56 @@
+"""Versioned schema migrations.
+
+Tables are still created by ``Base.metadata.create_all``; migrations cover
+what create_all cannot do on an existing database (new indexes, virtual
+tables, triggers, data backfills). Each module in ``migrations/versions``
+is named ``NNNN_description.py`` and defines ``upgrade(connection)``.
+Applied versions are recorded in the ``schema_migrations`` table.
+"""
+import importlib
+import pkgutil
+from datetime import datetime
+from typing import List, Tuple
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+from migrations import versions
+
+metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    metadata,
+    Column("version", String(100), primary_key=True),
+    Column("applied_at", DateTime, default=datetime.utcnow),
+)
+
+
+def discover() -> List[Tuple[str, object]]:
+    """All migration modules, ordered by version."""
+    names = sorted(info.name for info in pkgutil.iter_modules(versions.__path__))
+    return [(name, importlib.import_module(f"{versions.__name__}.{name}")) for name in names]
+
+
+def applied_versions(engine: Engine) -> set:
+    metadata.create_all(bind=engine)
+    with engine.connect() as connection:
+        return set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+
+def run_migrations(engine: Engine) -> List[str]:
+    """Apply pending migrations in order, each in its own transaction."""
+    applied = applied_versions(engine)
+    newly_applied = []
+    for version, module in discover():
+        if version in applied:
+            continue
+        try:
+            with engine.begin() as connection:
+                module.upgrade(connection)
+                connection.execute(schema_migrations.insert().values(version=version, applied_at=datetime.utcnow()))
+        except IntegrityError:
+            # Another worker recorded this version first; its DDL already ran
+            continue
+        newly_applied.append(version)
+    return newly_applied
@@ -0,0 +1,29 @@
+import sys
+
+from database import Base, engine
+from migrations import applied_versions, discover, run_migrations
+# Register every table on Base.metadata
+from models import email_outbox, idempotency_key, order, order_stat, product, product_stock_shard, sequence, user  # noqa: F401
+
+
+def status():
+    applied = applied_versions(engine)
+    for version, _ in discover():
+        print(f"[{'x' if version in applied else ' '}] {version}")
+
+
+def upgrade():
+    Base.metadata.create_all(bind=engine)
+    applied = run_migrations(engine)
+    print(f"Applied {len(applied)} migration(s)" + (": " + ", ".join(applied) if applied else ""))
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+    if command == "status":
+        status()
+    elif command == "upgrade":
+        upgrade()
+    else:
+        print("Usage: python -m migrations [upgrade|status]")
+        sys.exit(1)
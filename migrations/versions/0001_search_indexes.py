@@ -0,0 +1,8 @@
+"""Full-text product search and customer-name search indexes."""
+from crud.customer_search import ensure_customer_search_index
+from crud.product_search import ensure_search_index
+
+
+def upgrade(connection):
+    ensure_search_index(connection)
+    ensure_customer_search_index(connection)
@@ -0,0 +1,22 @@
+"""Foreign-key and composite indexes for the hot query shapes."""
+from sqlalchemy import text
+
+INDEXES = [
+    # Order lists: filter by user, newest first; filter by user + status
+    "CREATE INDEX IF NOT EXISTS ix_orders_user_created ON orders (user_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_orders_user_status_created ON orders (user_id, status, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_orders_customer_id ON orders (customer_id)",
+    # Order detail / delete joins
+    "CREATE INDEX IF NOT EXISTS ix_order_products_order_id ON order_products (order_id)",
+    "CREATE INDEX IF NOT EXISTS ix_order_products_product_id ON order_products (product_id)",
+    "CREATE INDEX IF NOT EXISTS ix_addresses_order_id ON addresses (order_id)",
+    "CREATE INDEX IF NOT EXISTS ix_invoices_order_id ON invoices (order_id)",
+    # Keyset pagination orderings
+    "CREATE INDEX IF NOT EXISTS ix_invoices_issued_date ON invoices (issued_date, id)",
+    "CREATE INDEX IF NOT EXISTS ix_products_created ON products (created_at, id)",
+]
+
+
+def upgrade(connection):
+    for statement in INDEXES:
+        connection.execute(text(statement))
@@ -0,0 +1,6 @@
+"""Fill order_stats from the orders that existed before it was maintained."""
+from crud.order_stats import rebuild_order_stats
+
+
+def upgrade(connection):
+    rebuild_order_stats(connection)
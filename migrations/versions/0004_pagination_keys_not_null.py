@@ -0,0 +1,40 @@
+"""Backfill and forbid NULL in the timestamps keyset pagination sorts on.
+
+A NULL sort key cannot be encoded in a cursor, and NULLs sort outside the
+keyset comparison, so those rows would be skipped or break the page.
+
+PostgreSQL gets a real NOT NULL constraint. SQLite cannot add one to an
+existing column without rebuilding the table, so there triggers reject
+NULLs instead; databases created from the models already have the
+constraint.
+"""
+from datetime import datetime
+
+from sqlalchemy import text
+
+# table, column, fallbacks for rows where it is NULL
+COLUMNS = [
+    ("products", "created_at", "updated_at"),
+    ("orders", "created_at", "order_date, updated_at"),
+    ("invoices", "issued_date", "created_at, updated_at"),
+]
+
+
+def upgrade(connection):
+    now = datetime.utcnow()
+    for table, column, fallbacks in COLUMNS:
+        connection.execute(
+            text(f"UPDATE {table} SET {column} = COALESCE({fallbacks}, :now) WHERE {column} IS NULL"),
+            {"now": now},
+        )
+        if connection.dialect.name == "postgresql":
+            connection.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL"))
+            continue
+
+        for event in ("INSERT", f"UPDATE OF {column}"):
+            name = f"{table}_{column}_not_null_{event.split()[0].lower()}"
+            connection.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {name} BEFORE {event} ON {table} "
+                f"WHEN NEW.{column} IS NULL "
+                f"BEGIN SELECT RAISE(ABORT, 'NOT NULL constraint failed: {table}.{column}'); END"
+            ))
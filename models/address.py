@@ -13,5 +13,5 @@ class Address(Base):
     city = Column(String(50))
     country = Column(String(50))    
 
-    order_id = Column(Integer, ForeignKey("orders.id"))
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
     order = relationship("Order", back_populates="shipping_address")
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from datetime import datetime
+from database import Base
+
+class IdempotencyKey(Base):
+    """The stored outcome of a request sent with an Idempotency-Key header."""
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    # SHA-256 of the request body; a reused key with another body is rejected
+    fingerprint = Column(String(64), nullable=False)
+    status = Column(String(20), nullable=False, default="in_progress")  # in_progress, completed
+    # Set while a request owns the key; the lease is locked_until
+    claim = Column(String(36), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -1,19 +1,22 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
 
 class Invoice(Base):
     __tablename__ = "invoices"
+    __table_args__ = (
+        Index("ix_invoices_issued_date", "issued_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     invoice_number = Column(String, unique=True, index=True)
     customer_name = Column(String, nullable=False)
-    issued_date = Column(DateTime, default=datetime.utcnow)
+    issued_date = Column(DateTime, nullable=False, default=datetime.utcnow)
     amount = Column(Float, nullable=False)
     status = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=True, index=True)
     order = relationship("Order", back_populates="invoice")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -12,15 +12,19 @@ from models.order_product import OrderProduct
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_user_created", "user_id", "created_at"),
+        Index("ix_orders_user_status_created", "user_id", "status", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     order_number = Column(String(20), unique=True, index=True)
-    customer_id = Column(Integer, ForeignKey("customers.id"))
+    customer_id = Column(Integer, ForeignKey("customers.id"), index=True)
     order_date = Column(DateTime, default=datetime.utcnow)
     amount = Column(Float, nullable=False)
     payment_method = Column(String(50))
     status = Column(SqlEnum(OrderStatus), default=OrderStatus.PENDING, nullable=False)  
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id = Column(Integer, ForeignKey("users.id"))
 
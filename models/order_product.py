@@ -6,8 +6,8 @@ class OrderProduct(Base):
     __tablename__ = "order_products"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
-    product_id = Column(Integer, ForeignKey("products.id"))
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), index=True)
     quantity = Column(Integer, nullable=False)
     discount = Column(Float, default=0.0)
     subtotal = Column(Float, nullable=False)
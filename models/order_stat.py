@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Date, Float, ForeignKey, Integer, String
+from sqlalchemy import Enum as SqlEnum
+from database import Base
+from .order_status import OrderStatus
+
+class OrderStat(Base):
+    """Order count and revenue per (user, day, status, payment method).
+
+    Maintained by crud.order_stats in the same transaction as every order
+    write, so dashboards read a handful of buckets instead of every order.
+    """
+    __tablename__ = "order_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    status = Column(SqlEnum(OrderStatus), primary_key=True)
+    # Empty string rather than NULL so it can be part of the key
+    payment_method = Column(String(50), primary_key=True, default="")
+    order_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, Index
 from datetime import datetime
 from database import Base
 from sqlalchemy.orm import relationship
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_created", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     product_name = Column(String(255), nullable=False)
@@ -35,7 +38,7 @@ class Product(Base):
     seo_description = Column(Text, nullable=True)
     product_status = Column(String(50), default="Draft")  # Draft, Published, etc.
     is_featured = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # For categories, tags, attributes, faqs — you can create related tables and setup relationships.
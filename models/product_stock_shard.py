@@ -0,0 +1,14 @@
+from sqlalchemy import Column, ForeignKey, Integer
+from database import Base
+
+class ProductStockShard(Base):
+    """One slice of a hot product's stock.
+
+    Checkouts decrement a single random shard, so concurrent buyers of the
+    product contend on several rows instead of the one products row.
+    """
+    __tablename__ = "product_stock_shards"
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
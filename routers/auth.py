@@ -1,25 +1,28 @@
 import random
 from datetime import timedelta
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import SessionLocal
 from models.user import User
 from schemas.user import *
-from utils.auth_dependency import get_current_user, get_db
-from utils.email_service import send_email
+from utils.auth_dependency import get_async_db, get_current_user
+from utils.email_service import email_worker, enqueue_email
 from utils.jwt_handler import create_access_token, create_refresh_token, verify_token
+from utils.password import hash_password, verify_password
 
 router = APIRouter(prefix="/auth", tags=["auth"])
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 @router.post("/signin", response_model=Token)
-def signin(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not pwd_context.verify(form_data.password, user.hashed_password):
+async def signin(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(User).filter(User.email == form_data.username))
+    user = result.scalars().first()
+    # End the read transaction so the pooled connection is free while bcrypt runs
+    await db.commit()
+    if not user or not await verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -43,27 +46,32 @@ def signin(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depen
     }
 
 @router.post("/forgot-password")
-def forgot_password(request: ForgotPasswordRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == request.email).first()
+async def forgot_password(request: ForgotPasswordRequest, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(User).filter(User.email == request.email))
+    user = result.scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     code = str(random.randint(100000, 999999))
     user.reset_code = code
-    db.commit()
-
-    background_tasks.add_task(send_email, user.email, "Password Reset Code", f"Use this code to reset your password: {code}")
+    # Queued in the same transaction as the code, delivered by the outbox worker
+    enqueue_email(db, user.email, "Password Reset Code", f"Use this code to reset your password: {code}")
+    await db.commit()
+    email_worker.notify()
     return {"message": "Reset code sent to your email"}
 
 @router.post("/reset-password")
-def reset_password(request: ResetPasswordRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == request.email).first()
+async def reset_password(request: ResetPasswordRequest, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(User).filter(User.email == request.email))
+    user = result.scalars().first()
     if not user or user.reset_code != request.code:
         raise HTTPException(status_code=400, detail="Invalid code or email")
 
-    user.hashed_password = pwd_context.hash(request.new_password)
+    # End the read transaction so the pooled connection is free while bcrypt runs
+    await db.commit()
+    user.hashed_password = await hash_password(request.new_password)
     user.reset_code = None
-    db.commit()
+    await db.commit()
     return {"message": "Password reset successful"}
 
 @router.get("/me", response_model=UserResponse)
@@ -1,73 +1,128 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.invoice import Invoice
 from schemas.invoice import InvoiceListOut
-from utils.auth_dependency import get_current_user, get_db
-from crud.invoice import create_invoice, get_invoice, update_invoice, delete_invoice
+from utils.auth_dependency import get_current_user, get_async_db
+from crud.aio.invoice import create_invoice, generate_invoices, get_invoice_summary, get_invoice_version, get_invoices, update_invoice, delete_invoice
 from models.user import User
-from typing import List
+from datetime import datetime
+from typing import List, Optional
+from config import settings
+from crud.invoice import export_invoices
+from utils.export import export_response
+from utils.pagination import parse_cursor, set_cursor_headers
+from utils.http_cache import has_conditional_headers, is_not_modified, make_etag, not_modified_response, set_validators
+from utils.serialization import invoice_list_adapter, json_response, model_response
 
 router = APIRouter(prefix="/invoices", tags=["invoices"])
 
 @router.post("/", response_model=InvoiceListOut, status_code=201)
 async def create_invoice_endpoint(
     invoice_in: InvoiceListOut,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new invoice."""
     try:
-        return create_invoice(db, invoice_in)
+        return await create_invoice(db, invoice_in)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/generate")
+async def generate_invoices_endpoint(
+    incremental: bool = Query(False, description="Only orders newer than the last invoiced order"),
+    since_order_id: Optional[int] = Query(None, ge=0, description="Only orders with a higher id"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Create invoices for every order that does not have one yet."""
+    try:
+        return await generate_invoices(db, incremental, since_order_id)
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/", response_model=List[InvoiceListOut])
 async def list_invoices(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor / X-Prev-Cursor"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List invoices with pagination."""
+    """List invoices with offset or cursor pagination."""
     try:
-        return get_invoices(db, skip, limit)
+        page = await get_invoices(db, skip, limit, parse_cursor(cursor))
     except ValueError as e:
         raise HTTPException(status_code=500, detail=str(e))
+    response = model_response(invoice_list_adapter, page.items)
+    set_cursor_headers(response, page)
+    return response
+
+@router.get("/export")
+def export_invoices_endpoint(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    start: Optional[datetime] = Query(None, description="Issued at or after"),
+    end: Optional[datetime] = Query(None, description="Issued before"),
+    status: Optional[str] = Query(None),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream all invoices as NDJSON or CSV."""
+    return export_response(
+        lambda db: export_invoices(db, start, end, status, settings.EXPORT_BATCH_SIZE),
+        format,
+        "invoices",
+    )
 
 @router.get("/{invoice_id}", response_model=InvoiceListOut)
 async def get_invoice_endpoint(
     invoice_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get invoice by ID."""
+    """Get invoice by ID.
+
+    Supports If-None-Match / If-Modified-Since, checked against a
+    version-only query before the invoice is loaded.
+    """
     try:
-        return get_invoice(db, invoice_id)
+        if has_conditional_headers(request):
+            version = await get_invoice_version(db, invoice_id)
+            if version is None:
+                raise HTTPException(status_code=404, detail="Invoice not found")
+            etag = make_etag("invoice", version.id, version.updated_at)
+            if is_not_modified(request, etag, version.updated_at):
+                return not_modified_response(etag, version.updated_at, private=True)
+        invoice = await get_invoice_summary(db, invoice_id)
     except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+    if invoice is None:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    response = json_response(InvoiceListOut.model_validate(invoice))
+    return set_validators(response, make_etag("invoice", invoice.id, invoice.updated_at), invoice.updated_at, private=True)
 
 @router.put("/{invoice_id}", response_model=InvoiceListOut)
 async def update_invoice_endpoint(
     invoice_id: int,
     invoice_update: InvoiceListOut,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update invoice information."""
     try:
-        return update_invoice(db, invoice_id, invoice_update)
+        return await update_invoice(db, invoice_id, invoice_update)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/{invoice_id}")
 async def delete_invoice_endpoint(
     invoice_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete invoice."""
     try:
-        delete_invoice(db, invoice_id)
+        await delete_invoice(db, invoice_id)
         return {"message": "Invoice deleted successfully"}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
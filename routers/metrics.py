@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends
+from crud.product import product_cache, product_list_cache
+from database import async_engine, engine, get_pool_stats
+from utils.auth_dependency import get_current_user, user_cache
+from utils.jwt_handler import token_cache
+from utils.metrics import catalog_latency
+from utils.singleflight import order_flight, product_flight
+from models.user import User
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("/db-pool")
+async def db_pool_stats(current_user: User = Depends(get_current_user)):
+    """Connection pool usage for this worker."""
+    return {
+        "sync": get_pool_stats(engine),
+        "async": get_pool_stats(async_engine.sync_engine),
+    }
+
+
+@router.get("/caches")
+async def cache_stats(current_user: User = Depends(get_current_user)):
+    """Hit/miss counters for the in-process caches of this worker."""
+    return {
+        "tokens": token_cache.stats(),
+        "users": user_cache.stats(),
+        "products": product_cache.stats(),
+        "product_lists": product_list_cache.stats(),
+    }
+
+
+@router.get("/coalescing")
+async def coalescing_stats(current_user: User = Depends(get_current_user)):
+    """Requests served by another request's in-flight query, per endpoint, in this worker."""
+    return {
+        "product_detail": product_flight.stats(),
+        "order_detail": order_flight.stats(),
+    }
+
+
+@router.get("/latency")
+async def latency_stats(current_user: User = Depends(get_current_user)):
+    """Recent p50/p99 latency of the catalog read endpoints in this worker."""
+    return {
+        "catalog": catalog_latency.stats(),
+    }
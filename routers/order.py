@@ -1,171 +1,240 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.invoice import Invoice
 from models.order import Order, OrderStatus
 from models.user import User
 from schemas.order import OrderOut, OrderListOut, OrderDetailOut
 from schemas.combined import OrderCreateCombined
 from schemas.invoice import InvoiceListOut
-from utils.auth_dependency import get_current_user, get_db
-from crud.order import crud_create_order, crud_get_orders,crud_filter_orders,crud_delete_order,crud_get_order_by_orderNumber,crud_update_order
+from utils.auth_dependency import get_current_user, get_async_db
+from crud.aio.order import crud_create_order, crud_get_orders,crud_filter_orders,crud_delete_order,crud_get_order_by_orderNumber,crud_update_order,crud_get_order_list,crud_get_order_stats,crud_get_order_version
+from crud.aio.invoice import get_invoices as crud_get_invoices
+from crud.order import crud_export_orders
+from config import settings
+from database import AsyncSessionLocal
+from utils.export import export_response
+from utils.http_cache import has_conditional_headers, is_not_modified, make_etag, not_modified_response, set_validators
+from utils.idempotency import abort_request, begin_request, finish_request
+from utils.pagination import parse_cursor, set_cursor_headers
+from utils.serialization import encode_model, invoice_list_adapter, json_response, model_response, order_list_adapter, order_out_list_adapter, raw_json_response
+from utils.singleflight import order_flight
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
 @router.post("/", response_model=OrderOut, status_code=201)
 async def create_order(
     order_in: OrderCreateCombined,
-    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, max_length=255, description="Retries with the same key get the first response"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new order."""
+    if not idempotency_key:
+        try:
+            return await crud_create_order(db, order_in, current_user.id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    claim, replay = await begin_request(db, current_user.id, idempotency_key, order_in)
+    if replay is not None:
+        return replay
     try:
-        result =  crud_create_order(db, order_in, current_user.id)
-        return result
+        result = await crud_create_order(db, order_in, current_user.id, idempotency_key, claim)
     except ValueError as e:
+        await abort_request(db, current_user.id, idempotency_key, claim)
         raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        finish_request(current_user.id, idempotency_key)
+    # The same bytes a replay returns
+    return json_response(OrderOut.model_validate(result), status_code=201)
 
 @router.get("/", response_model=List[OrderOut])
 async def list_orders(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """List all orders for the current user."""
     try:
-        return crud_get_orders(db, current_user.id)
+        orders = await crud_get_orders(db, current_user.id)
     except ValueError as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return model_response(order_out_list_adapter, orders)
 
 @router.get("/filter/", response_model=List[OrderOut])
 async def filter_orders_endpoint(
     status: Optional[str] = Query(None, description="Order status (Pending, Delivered, etc)"),
     customer_name: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Filter orders based on status and customer name."""
     try:
-        return crud_filter_orders(db, current_user.id, status, customer_name)
+        orders = await crud_filter_orders(db, current_user.id, status, customer_name)
     except ValueError as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return model_response(order_out_list_adapter, orders)
 
 @router.put("/{order_id}", response_model=OrderOut)
 async def update_order_endpoint(
     order_id: int,
     order_update: OrderCreateCombined,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update an existing order."""
     try:
-        return crud_update_order(db, order_id, order_update, current_user.id)
+        return await crud_update_order(db, order_id, order_update, current_user.id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/{order_id}")
 async def delete_order_endpoint(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete an order."""
     try:
-        crud_delete_order(db, order_id, current_user.id)
+        await crud_delete_order(db, order_id, current_user.id)
         return {"message": "Order deleted successfully"}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/list", response_model=List[OrderListOut])
-def get_order_list(
+async def get_order_list(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor / X-Prev-Cursor"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    orders = (
-        db.query(Order)
-        .filter(Order.user_id == current_user.id)
-        .order_by(Order.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
-
-    result = [
-        OrderListOut(
-            invoice=order.order_number,
-            customer_name=order.customer.first_name + " " + order.customer.last_name,
-            order_date=order.created_at,
-            amount=order.total,
-            payment_method=order.payment_method,
-            status=order.status
-        )
-        for order in orders
-    ]
-    return result
+    try:
+        page = await crud_get_order_list(db, current_user.id, skip, limit, parse_cursor(cursor))
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    response = model_response(order_list_adapter, page.items)
+    set_cursor_headers(response, page)
+    return response
 
 @router.get("/shippings/list", response_model=List[OrderListOut])
-def get_order_list(
+async def get_shipping_list(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor / X-Prev-Cursor"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    orders = (
-        db.query(Order)
-        .filter(Order.user_id == current_user.id)
-        .order_by(Order.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
-
-    result = [
-        OrderListOut(
-            invoice=order.order_number,
-            customer_name=order.customer.first_name + " " + order.customer.last_name,
-            order_date=order.created_at,
-            amount=order.total,
-            payment_method=order.payment_method,
-            status=order.status
-        )
-        for order in orders
-    ]
-    return result
+    try:
+        page = await crud_get_order_list(db, current_user.id, skip, limit, parse_cursor(cursor))
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    response = model_response(order_list_adapter, page.items)
+    set_cursor_headers(response, page)
+    return response
 
 @router.get("/invoices/list", response_model=List[InvoiceListOut])
-def get_invoices(
+async def get_invoices(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, le=100),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor / X-Prev-Cursor"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        page = await crud_get_invoices(db, skip, limit, parse_cursor(cursor))
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    response = model_response(invoice_list_adapter, page.items)
+    set_cursor_headers(response, page)
+    return response
+
+@router.get("/stats")
+async def get_order_stats(
+    start: Optional[date] = Query(None, description="First day, inclusive"),
+    end: Optional[date] = Query(None, description="Last day, inclusive"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
 ):
-    invoices = (
-        db.query(Invoice)
-        .order_by(Invoice.issued_date.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    """Order count and revenue by day, status and payment method."""
+    try:
+        return await crud_get_order_stats(db, current_user.id, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/export")
+def export_orders(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    start: Optional[datetime] = Query(None, description="Created at or after"),
+    end: Optional[datetime] = Query(None, description="Created before"),
+    status: Optional[OrderStatus] = Query(None),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream all of the current user's orders as NDJSON or CSV."""
+    return export_response(
+        lambda db: crud_export_orders(db, current_user.id, start, end, status, settings.EXPORT_BATCH_SIZE),
+        format,
+        "orders",
     )
-    return [
-        InvoiceListOut(
-            invoice=invoice.invoice_number,
-            customer_name=invoice.customer_name,  # stored directly
-            issued_date=invoice.issued_date,
-            amount=invoice.amount,
-            status=invoice.status,
-        )
-        for invoice in invoices
-    ]
 
 
+def order_validators(version: Tuple) -> Tuple[str, Optional[datetime]]:
+    """ETag and Last-Modified from crud_get_order_version's row."""
+    order_id, updated_at, products_updated_at, line_count = version
+    etag = make_etag("order", order_id, updated_at, products_updated_at, line_count)
+    return etag, max(filter(None, (updated_at, products_updated_at)), default=None)
+
+async def load_order_version(order_number: str, user_id: int):
+    # Own session, closed before waiting on order_flight: a request session
+    # would hold its connection while the shared load needs another
+    async with AsyncSessionLocal() as db:
+        return await crud_get_order_version(db, order_number, user_id)
+
+async def load_order_body(order_number: str, user_id: int) -> Optional[Tuple[str, Optional[datetime], bytes]]:
+    # Runs once per burst of identical requests, on its own session. The
+    # version is read before the order, so the body is never older than the
+    # ETag it is sent with.
+    async with AsyncSessionLocal() as db:
+        version = await crud_get_order_version(db, order_number, user_id)
+        if version is None:
+            return None
+        order = await crud_get_order_by_orderNumber(db, order_number, user_id)
+    if order is None:
+        return None
+    return (*order_validators(version), encode_model(order))
+
 @router.get("/{order_number}", response_model=OrderDetailOut)
-def get_order(
+async def get_order(
     order_number: str,
-    db: Session = Depends(get_db),
+    request: Request,
     current_user=Depends(get_current_user)
 ):
-    order = crud_get_order_by_orderNumber(db, order_number, current_user.id)
-    if not order:
+    """Get an order with its customer, address and line items.
+
+    If-None-Match / If-Modified-Since are checked against a version-only
+    query, so a 304 never loads the order. Concurrent requests by the same
+    user for the same order share one query.
+    """
+    try:
+        if has_conditional_headers(request):
+            version = await order_flight.do(
+                ("order version", current_user.id, order_number),
+                lambda: load_order_version(order_number, current_user.id),
+            )
+            if version is None:
+                raise HTTPException(status_code=404, detail="Order not found")
+            etag, last_modified = order_validators(version)
+            if is_not_modified(request, etag, last_modified):
+                return not_modified_response(etag, last_modified, private=True)
+        # The ETag comes back with the body it was read with
+        loaded = await order_flight.do(
+            ("GET /orders/{order_number}", current_user.id, order_number),
+            lambda: load_order_body(order_number, current_user.id),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if loaded is None:
         raise HTTPException(status_code=404, detail="Order not found")
-    return order
+    etag, last_modified, body = loaded
+    return set_validators(raw_json_response(body), etag, last_modified, private=True)
@@ -1,73 +1,221 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Any, Iterable, Optional, Tuple
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.product import Product
 from schemas.product import ProductCreate, ProductUpdate
-from utils.auth_dependency import get_current_user, get_db
-from crud.product import create_product as create_product_crud, get_products, get_product, update_product, delete_product
+from utils.auth_dependency import get_current_user, get_async_db
+from crud.aio.product import (
+    create_product as create_product_crud,
+    get_product_page_versions,
+    get_product_version,
+    get_products_cached,
+    load_product_record,
+    update_product as update_product_crud,
+    delete_product as delete_product_crud,
+    search_products,
+)
+from crud.aio.inventory import set_stock_shards
+from crud.product import peek_products_cached, product_cache, serialize_product
+from crud.product_import import import_products, iter_lines
+from config import settings
+from database import AsyncSessionLocal, SessionLocal
 from models.user import User
+from utils.http_cache import as_datetime, has_conditional_headers, is_not_modified, make_etag, not_modified_response, set_validators
+from utils.metrics import catalog_latency
+from utils.pagination import Page, parse_cursor, set_cursor_headers
+from utils.serialization import encode_json, orjson_response, raw_json_response
+from utils.singleflight import product_flight
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+def product_validators(product_id: int, updated_at: Any) -> Tuple[str, Optional[datetime]]:
+    return make_etag("product", product_id, updated_at), as_datetime(updated_at)
+
+def page_validators(page: Page, versions: Iterable[Tuple[int, Any]]) -> Tuple[str, Optional[datetime]]:
+    """Validators of a product list page from its items' (id, updated_at)."""
+    versions = list(versions)
+    etag = make_etag("products", page.next_cursor, page.prev_cursor, *(part for version in versions for part in version))
+    modified = [as_datetime(updated_at) for _, updated_at in versions if updated_at is not None]
+    return etag, max(modified, default=None)
+
 @router.get("/")
 async def list_products(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor / X-Prev-Cursor"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List products with pagination."""
-    try:
-        return get_products(db, skip, limit)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    """List products with offset or cursor pagination.
+
+    Supports If-None-Match / If-Modified-Since; on a cache miss they are
+    checked against the page's (id, updated_at) before products are loaded.
+    """
+    with catalog_latency.time():
+        position = parse_cursor(cursor)
+        try:
+            page = peek_products_cached(skip, limit, position)
+            if page is None and has_conditional_headers(request):
+                versions = await get_product_page_versions(db, skip, limit, position)
+                etag, last_modified = page_validators(versions, ((row.id, row.updated_at) for row in versions.items))
+                if is_not_modified(request, etag, last_modified):
+                    return not_modified_response(etag, last_modified)
+            if page is None:
+                page = await get_products_cached(db, skip, limit, position)
+        except ValueError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        etag, last_modified = page_validators(page, ((item["id"], item["updated_at"]) for item in page.items))
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        # Cached items are already JSON-ready dicts
+        response = orjson_response(page.items)
+        set_cursor_headers(response, page)
+        return set_validators(response, etag, last_modified)
 
 @router.post("/", status_code=201)
 async def create_product(
     product_in: ProductCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new product."""
     try:
-        return create_product_crud(db, product_in)
+        return await create_product_crud(db, product_in)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/{product_id}")
-async def get_product(
-    product_id: int,
-    db: Session = Depends(get_db)
+@router.post("/bulk")
+async def bulk_import_products(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(jsonl|csv)$", description="Defaults from Content-Type"),
+    current_user: User = Depends(get_current_user)
 ):
-    """Get a single product by ID."""
+    """Upsert products on permalink from a streamed JSON Lines or CSV body.
+
+    Returns counts and per-row validation/database errors; bad rows are
+    skipped, not fatal.
+    """
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "jsonl"
+    body = request.stream()
+
+    def chunks():
+        # Pull the request body from the event loop as the import consumes it
+        while True:
+            try:
+                yield anyio.from_thread.run(body.__anext__)
+            except StopAsyncIteration:
+                return
+
+    def run():
+        db = SessionLocal()
+        try:
+            return import_products(db, iter_lines(chunks()), format, settings.PRODUCT_IMPORT_CHUNK_SIZE)
+        finally:
+            db.close()
+
     try:
-        product = get_product(db, product_id)
-        if not product:
-            raise HTTPException(status_code=404, detail="Product not found")
-        return product
+        return await run_in_threadpool(run)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/search")
+async def search_products_endpoint(
+    q: str = Query(..., min_length=1, description="Search terms; each term is prefix-matched"),
+    brand: Optional[str] = Query(None),
+    collection: Optional[str] = Query(None),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Full-text search over name, description, brand, collection, SEO keywords and SKU."""
+    try:
+        products = await search_products(db, q, brand, collection, min_price, max_price, limit)
     except ValueError as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return orjson_response([serialize_product(product) for product in products])
+
+async def load_product_body(product_id: int) -> Optional[Tuple[dict, bytes]]:
+    # Runs once per burst of cache misses, on its own session
+    async with AsyncSessionLocal() as db:
+        product = await load_product_record(db, product_id)
+    return (product, encode_json(product)) if product else None
+
+async def load_product_version(product_id: int):
+    # Own session, closed before waiting on product_flight
+    async with AsyncSessionLocal() as db:
+        return await get_product_version(db, product_id)
+
+@router.get("/{product_id}")
+async def get_product(product_id: int, request: Request):
+    """Get a single product by ID.
+
+    Supports If-None-Match / If-Modified-Since, checked against a
+    version-only query on a cache miss. Concurrent cache misses for the
+    same product share one query.
+    """
+    with catalog_latency.time():
+        cached = product_cache.get(product_id)
+        if cached is not None:
+            etag, last_modified = product_validators(cached["id"], cached["updated_at"])
+            if is_not_modified(request, etag, last_modified):
+                return not_modified_response(etag, last_modified)
+            return set_validators(orjson_response(cached), etag, last_modified)
+        try:
+            if has_conditional_headers(request):
+                version = await load_product_version(product_id)
+                if version is None:
+                    raise HTTPException(status_code=404, detail="Product not found")
+                etag, last_modified = product_validators(version.id, version.updated_at)
+                if is_not_modified(request, etag, last_modified):
+                    return not_modified_response(etag, last_modified)
+            loaded = await product_flight.do(("GET /products/{product_id}", product_id), lambda: load_product_body(product_id))
+        except ValueError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        if loaded is None:
+            raise HTTPException(status_code=404, detail="Product not found")
+        product, body = loaded
+        return set_validators(raw_json_response(body), *product_validators(product["id"], product["updated_at"]))
 
 @router.put("/{product_id}")
 async def update_product(
     product_id: int,
     update_data: ProductUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update an existing product."""
     try:
-        return update_product(db, product_id, update_data)
+        return await update_product_crud(db, product_id, update_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.put("/{product_id}/stock-shards")
+async def set_stock_shards_endpoint(
+    product_id: int,
+    shards: int = Query(..., ge=0, le=64, description="Counter rows to split the stock across; 0 folds it back"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Shard a hot product's stock so concurrent checkouts do not queue on one row."""
+    try:
+        return await set_stock_shards(db, product_id, shards)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/{product_id}")
 async def delete_product(
     product_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a product."""
     try:
-        delete_product(db, product_id)
+        await delete_product_crud(db, product_id)
         return {"message": "Product deleted successfully"}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -44,26 +44,6 @@ class ProductOut(BaseSchema):
             created_at=obj.created_at
         )
 
-    class Config:
-        from_attributes = True
-
-    @classmethod
-    def from_orm(cls, obj):
-        return cls(
-            id=obj.id,
-            product_name=obj.product_name,
-            description=obj.description,
-            price=obj.regular_price,
-            stock_status=obj.stock_status,
-            quantity=obj.stock_quantity,
-            sku_no=obj.sku,
-            permalink=obj.permalink,
-            image=obj.image,
-            content=obj.description,
-            status='active',
-            created_at=obj.created_at
-        )
-
 
 class ProductCreate(BaseModel):
     product_name: constr(min_length=1)
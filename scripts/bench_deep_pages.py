@@ -0,0 +1,118 @@
+"""Time the first and a deep page of the order list, by offset and by cursor.
+
+Seeds N orders (1M by default) for one user into a throwaway SQLite file,
+then times crud_get_order_list for page 1, for a page near the end
+reached with skip (the old OFFSET query), and for the same page reached
+with a keyset cursor. Offset pages get slower the deeper they go; cursor
+pages should cost about the same as page 1.
+
+Usage: python -m scripts.bench_deep_pages [--orders 1000000] [--limit 20]
+"""
+import argparse
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from crud.order import crud_get_order_list
+from migrations import run_migrations
+from models.customer import Customer
+from models.order import Order, OrderStatus
+from models.user import User
+from scripts.scratch import scratch_engine
+from utils.pagination import Cursor
+
+SEED_CHUNK = 50000
+CUSTOMERS = 1000
+
+
+def seed(engine, orders: int) -> int:
+    start = datetime(2020, 1, 1)
+    with Session(engine) as db:
+        owner = User(email="bench-owner@example.com", name="Bench", hashed_password="x")
+        db.add(owner)
+        db.flush()
+        user_id = owner.id
+        db.execute(insert(Customer), [
+            {"first_name": "Customer", "last_name": str(number), "email": f"customer{number}@example.com"}
+            for number in range(CUSTOMERS)
+        ])
+        for offset in range(0, orders, SEED_CHUNK):
+            db.execute(insert(Order), [
+                {
+                    "order_number": f"ORD-{number + 1:07d}",
+                    "customer_id": number % CUSTOMERS + 1,
+                    "amount": 10,
+                    "payment_method": "UPI",
+                    "status": OrderStatus.PENDING,
+                    "user_id": user_id,
+                    "created_at": start + timedelta(seconds=number),
+                    "updated_at": start + timedelta(seconds=number),
+                }
+                for number in range(offset, min(offset + SEED_CHUNK, orders))
+            ])
+        db.commit()
+    return user_id
+
+
+def timed(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Deep-page latency: OFFSET vs keyset cursor")
+    parser.add_argument("--database-url", help="Defaults to a temporary SQLite file")
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if args.orders <= 2 * args.limit:
+        parser.error("--orders must be more than twice --limit")
+
+    with scratch_engine(args.database_url) as engine:
+        run_migrations(engine)
+        started = time.perf_counter()
+        user_id = seed(engine, args.orders)
+        print(f"Seeded {args.orders} orders in {time.perf_counter() - started:.1f}s")
+
+        deep = args.orders - 2 * args.limit
+        with Session(engine) as db:
+            # Position of the row just before the deep page, newest first
+            created_at, order_id = db.execute(
+                select(Order.created_at, Order.id)
+                .where(Order.user_id == user_id)
+                .order_by(Order.created_at.desc(), Order.id.desc())
+                .offset(deep - 1)
+                .limit(1)
+            ).one()
+            cursor = Cursor(created_at, order_id)
+
+            def page(**kwargs):
+                items = crud_get_order_list(db, user_id, limit=args.limit, **kwargs).items
+                assert len(items) == args.limit, f"expected {args.limit} rows, got {len(items)}"
+                return [item.id for item in items]
+
+            # Both ways of reaching the deep page must return the same rows
+            assert page(skip=deep) == page(cursor=cursor), "offset and cursor pages differ"
+
+            results = [
+                ("page 1", timed(lambda: page(), args.repeat)),
+                (f"offset {deep}", timed(lambda: page(skip=deep), args.repeat)),
+                (f"cursor at row {deep}", timed(lambda: page(cursor=cursor), args.repeat)),
+            ]
+
+    for name, ms in results:
+        print(f"{name:>24}: {ms:8.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Time the order filters on a large seeded database.
+
+Seeds 200k customers and 1M orders (by default) for one user into a
+throwaway SQLite file and runs the migrations, which build the customer
+name search index. Then times crud_filter_orders by status and by
+customer name. Name searches are also timed with the plain ILIKE filter
+the search index replaced, to show what the index saves.
+
+Statuses are skewed the way a live shop's are: most orders are
+delivered, few are pending. Customers are named "<first name>
+Family<n>", so a "Family<n>" search matches one customer and a
+first-name search matches one in every len(FIRST_NAMES) customers.
+
+Usage: python -m scripts.bench_order_filters [--orders 1000000] [--customers 200000]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from crud.customer_search import customer_name_filter
+from crud.order import crud_filter_orders
+from migrations import run_migrations
+from models.customer import Customer
+from models.order import Order, OrderStatus
+from models.user import User
+from scripts.scratch import scratch_engine
+
+SEED_CHUNK = 50000
+FIRST_NAMES = ["Aarav", "Diya", "Ishaan", "Kavya", "Meera", "Nikhil", "Priya", "Rohan", "Sanya", "Vikram"]
+# Out of every 100 orders
+STATUS_MIX = [OrderStatus.PENDING] * 2 + [OrderStatus.PROCESSING] * 8 + [OrderStatus.CANCELLED] * 5 + [OrderStatus.DELIVERED] * 85
+
+
+def seed(engine, orders: int, customers: int) -> int:
+    start = datetime(2020, 1, 1)
+    # Seeded, so every run filters the same rows
+    statuses = random.Random(0)
+    with Session(engine) as db:
+        owner = User(email="bench-owner@example.com", name="Bench", hashed_password="x")
+        db.add(owner)
+        db.flush()
+        user_id = owner.id
+        for offset in range(0, customers, SEED_CHUNK):
+            db.execute(insert(Customer), [
+                {
+                    "first_name": FIRST_NAMES[number % len(FIRST_NAMES)],
+                    "last_name": f"Family{number:06d}",
+                    "email": f"customer{number}@example.com",
+                }
+                for number in range(offset, min(offset + SEED_CHUNK, customers))
+            ])
+        for offset in range(0, orders, SEED_CHUNK):
+            db.execute(insert(Order), [
+                {
+                    "order_number": f"ORD-{number + 1:07d}",
+                    "customer_id": number % customers + 1,
+                    "amount": 10,
+                    "payment_method": "UPI",
+                    "status": statuses.choice(STATUS_MIX),
+                    "user_id": user_id,
+                    "created_at": start + timedelta(seconds=number),
+                    "updated_at": start + timedelta(seconds=number),
+                }
+                for number in range(offset, min(offset + SEED_CHUNK, orders))
+            ])
+        db.commit()
+    return user_id
+
+
+def ilike_filter_orders(db: Session, user_id: int, customer_name: str):
+    """crud_filter_orders' name search as it was before the search index."""
+    return (
+        db.query(Order)
+        .filter(Order.user_id == user_id)
+        .join(Customer)
+        .filter(customer_name_filter("ilike", customer_name))
+        .order_by(Order.created_at.desc())
+        .all()
+    )
+
+
+def timed(fn, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="crud_filter_orders latency by status and customer name")
+    parser.add_argument("--database-url", help="Defaults to a temporary SQLite file")
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--customers", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with scratch_engine(args.database_url) as engine:
+        started = time.perf_counter()
+        user_id = seed(engine, args.orders, args.customers)
+        run_migrations(engine)
+        print(f"Seeded {args.customers} customers and {args.orders} orders in {time.perf_counter() - started:.1f}s")
+
+        one_family = f"Family{args.customers // 2:06d}"
+        cases = [
+            ("status=Pending", lambda db: crud_filter_orders(db, user_id, status=OrderStatus.PENDING)),
+            ("status=Processing", lambda db: crud_filter_orders(db, user_id, status=OrderStatus.PROCESSING)),
+            (f"name={one_family}", lambda db: crud_filter_orders(db, user_id, customer_name=one_family)),
+            (f"  ILIKE {one_family}", lambda db: ilike_filter_orders(db, user_id, one_family)),
+            ("name=Priya", lambda db: crud_filter_orders(db, user_id, customer_name="Priya")),
+            ("  ILIKE Priya", lambda db: ilike_filter_orders(db, user_id, "Priya")),
+            ("status=Pending, name=Priya",
+             lambda db: crud_filter_orders(db, user_id, status=OrderStatus.PENDING, customer_name="Priya")),
+        ]
+        print(f"{'filter':>28} {'median ms':>10} {'rows':>8}")
+        for name, case in cases:
+            with Session(engine) as db:
+                ms, rows = timed(lambda: case(db), args.repeat)
+            print(f"{name:>28} {ms:>10.1f} {rows:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
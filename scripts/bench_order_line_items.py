@@ -0,0 +1,90 @@
+"""Time crud_create_order as the number of line items grows.
+
+Creates orders of 1, 10, 50 and 200 distinct products on a throwaway
+SQLite file and prints the median and p95 latency and the SQL statements
+each order ran. Products are loaded with one IN query and the line items
+inserted with one executemany; what still grows with the cart is the
+stock reservation, one conditional UPDATE per distinct product.
+
+To compare with an older crud_create_order, run the same command on a
+checkout of that commit.
+
+Usage: python -m scripts.bench_order_line_items [--repeat 20] [--lines 1 10 50 200]
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from crud.order import crud_create_order
+from models.product import Product
+from models.user import User
+from schemas.combined import OrderCreateCombined
+from scripts.scratch import scratch_engine
+
+
+def order_for(product_ids) -> OrderCreateCombined:
+    return OrderCreateCombined.model_validate({
+        "customer": {"first_name": "Bench", "last_name": "Buyer", "email": "bench@example.com"},
+        "shipping_address": {"city": "Bench"},
+        "payment_method": "UPI",
+        "products": [{"product_id": product_id, "quantity": 1} for product_id in product_ids],
+    })
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Order creation latency by line-item count")
+    parser.add_argument("--database-url", help="Defaults to a temporary SQLite file")
+    parser.add_argument("--lines", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=20, help="Orders timed per line count")
+    args = parser.parse_args()
+
+    with scratch_engine(args.database_url) as engine:
+        with Session(engine) as db:
+            owner = User(email="bench-owner@example.com", name="Bench", hashed_password="x")
+            db.add(owner)
+            db.flush()
+            user_id = owner.id
+            # Enough stock that no timed order is rejected
+            db.execute(insert(Product), [
+                {"product_name": f"Bench {number}", "permalink": f"bench-{number}", "regular_price": 10,
+                 "stock_quantity": 10 * args.repeat * len(args.lines) + 10}
+                for number in range(max(args.lines))
+            ])
+            db.commit()
+            product_ids = [product.id for product in db.query(Product.id).order_by(Product.id)]
+
+        statements = 0
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            nonlocal statements
+            statements += 1
+
+        event.listen(engine, "before_cursor_execute", count)
+        # Warm up: mapper configuration and the first order number block
+        with Session(engine) as db:
+            crud_create_order(db, order_for(product_ids[:1]), user_id)
+
+        print(f"{'lines':>6} {'median ms':>10} {'p95 ms':>8} {'ms/line':>8} {'statements':>11}")
+        for lines in args.lines:
+            order_data = order_for(product_ids[:lines])
+            timings = []
+            statements = 0
+            for _ in range(args.repeat):
+                with Session(engine) as db:
+                    start = time.perf_counter()
+                    crud_create_order(db, order_data, user_id)
+                    timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            median = statistics.median(timings)
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"{lines:>6} {median:>10.2f} {p95:>8.2f} {median / lines:>8.3f} {statements / args.repeat:>11.1f}")
+        event.remove(engine, "before_cursor_execute", count)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
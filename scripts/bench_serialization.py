@@ -0,0 +1,104 @@
+"""Time encoding a list of orders the old way and through the shared adapters.
+
+Loads --rows orders from a throwaway SQLite file once, then times turning
+them into a JSON response body:
+
+- ``OrderOut.from_orm`` per row, ``jsonable_encoder`` and ``JSONResponse``
+  (what the routes did before utils.serialization);
+- ``model_response(order_out_list_adapter, ...)``, one validation pass and
+  pydantic-core's JSON encoder;
+- ``order_out_list_adapter`` validation, ``dump_python`` and
+  ``orjson_response``.
+
+All three bodies are checked to decode to the same data.
+
+Usage: python -m scripts.bench_serialization [--rows 1000] [--repeat 50]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import warnings
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from models.customer import Customer
+from models.order import Order, OrderStatus
+from models.user import User
+from schemas.order import OrderOut
+from scripts.scratch import scratch_engine
+from utils.serialization import model_response, order_out_list_adapter, orjson_response
+
+
+def from_orm_response(orders):
+    with warnings.catch_warnings():
+        # from_orm is deprecated in pydantic 2, which is part of the point
+        warnings.simplefilter("ignore", DeprecationWarning)
+        return JSONResponse(jsonable_encoder([OrderOut.from_orm(order) for order in orders]))
+
+
+def adapter_response(orders):
+    return model_response(order_out_list_adapter, orders)
+
+
+def adapter_orjson_response(orders):
+    validated = order_out_list_adapter.validate_python(orders)
+    return orjson_response(order_out_list_adapter.dump_python(validated, mode="json"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Order list serialization: from_orm + JSONResponse vs adapters")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with scratch_engine() as engine:
+        start = datetime(2020, 1, 1)
+        with Session(engine) as db:
+            owner = User(email="bench-owner@example.com", name="Bench", hashed_password="x")
+            customer = Customer(first_name="Bench", last_name="Buyer", email="bench@example.com")
+            db.add_all([owner, customer])
+            db.flush()
+            db.execute(insert(Order), [
+                {
+                    "order_number": f"ORD-{number + 1:05d}",
+                    "customer_id": customer.id,
+                    "amount": 10 + number / 100,
+                    "payment_method": "UPI",
+                    "status": OrderStatus.PENDING,
+                    "user_id": owner.id,
+                    "created_at": start + timedelta(seconds=number),
+                    "updated_at": start + timedelta(seconds=number),
+                }
+                for number in range(args.rows)
+            ])
+            db.commit()
+            orders = db.query(Order).order_by(Order.id).all()
+
+            cases = [
+                ("from_orm + JSONResponse", from_orm_response),
+                ("adapter + model_response", adapter_response),
+                ("adapter + orjson", adapter_orjson_response),
+            ]
+            bodies = [json.loads(fn(orders).body) for _, fn in cases]
+            assert all(body == bodies[0] for body in bodies), "the responses encode different data"
+
+            print(f"{'path':>26} {'median ms':>10} {'per row us':>11}")
+            for name, fn in cases:
+                timings = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    fn(orders)
+                    timings.append((time.perf_counter() - started) * 1000)
+                median = statistics.median(timings)
+                print(f"{name:>26} {median:>10.2f} {median * 1000 / args.rows:>11.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
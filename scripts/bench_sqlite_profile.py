@@ -0,0 +1,125 @@
+"""Compare SQLite's default rollback journal with the WAL performance profile.
+
+Runs the same workload twice, each on a fresh throwaway SQLite file: once
+with SQLite defaults and once with apply_sqlite_profile (WAL,
+synchronous, mmap, cache size, busy_timeout, in-memory temp store).
+Writer threads create orders through crud_create_order; with --readers,
+reader threads page the order list meanwhile, pausing between requests.
+Prints write throughput, failed writes ("database is locked") and reader
+latency for each mode.
+
+Usage: python -m scripts.bench_sqlite_profile [--writers 8] [--orders 50] [--readers 0]
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from crud.order import crud_create_order, crud_get_order_list
+from models.product import Product
+from models.user import User
+from schemas.combined import OrderCreateCombined
+from scripts.scratch import scratch_engine
+
+
+def run(profile: bool, writers: int, orders: int, readers: int, read_interval: float) -> dict:
+    with scratch_engine(sqlite_profile=profile) as engine:
+        with Session(engine) as db:
+            owner = User(email="bench-owner@example.com", name="Bench", hashed_password="x")
+            db.add(owner)
+            db.flush()
+            user_id = owner.id
+            db.execute(insert(Product), [
+                {"product_name": f"Bench {number}", "permalink": f"bench-{number}", "regular_price": 10, "stock_quantity": 10 ** 6}
+                for number in range(5)
+            ])
+            db.commit()
+
+        order_data = OrderCreateCombined.model_validate({
+            "customer": {"first_name": "Bench", "last_name": "Buyer", "email": "bench@example.com"},
+            "shipping_address": {"city": "Bench"},
+            "payment_method": "UPI",
+            "products": [{"product_id": product_id, "quantity": 1} for product_id in range(1, 6)],
+        })
+        failed = 0
+        read_timings = []
+        lock = threading.Lock()
+        writing = threading.Event()
+        writing.set()
+
+        def write(_):
+            nonlocal failed
+            for _ in range(orders):
+                with Session(engine) as db:
+                    try:
+                        crud_create_order(db, order_data, user_id)
+                    except ValueError:
+                        with lock:
+                            failed += 1
+
+        def read(_):
+            while writing.is_set():
+                with Session(engine) as db:
+                    start = time.perf_counter()
+                    try:
+                        crud_get_order_list(db, user_id, limit=20)
+                    except ValueError:
+                        continue
+                    elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    read_timings.append(elapsed)
+                time.sleep(read_interval)
+
+        # crud_create_order prints a traceback for every failed order
+        with contextlib.redirect_stderr(io.StringIO()), ThreadPoolExecutor(writers + readers) as pool:
+            reading = [pool.submit(read, None) for _ in range(readers)]
+            start = time.perf_counter()
+            list(pool.map(write, range(writers)))
+            elapsed = time.perf_counter() - start
+            writing.clear()
+            for future in reading:
+                future.result()
+
+    attempts = writers * orders
+    read_timings.sort()
+    return {
+        "elapsed": elapsed,
+        "orders/s": (attempts - failed) / elapsed,
+        "failed": failed,
+        "attempts": attempts,
+        "reads": len(read_timings),
+        "read p50": statistics.median(read_timings) if read_timings else 0.0,
+        "read p99": read_timings[int(len(read_timings) * 0.99)] if read_timings else 0.0,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Write contention: rollback journal vs the WAL profile")
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--orders", type=int, default=50, help="Orders per writer")
+    parser.add_argument("--readers", type=int, default=0)
+    parser.add_argument("--read-interval", type=float, default=10, help="Pause between a reader's requests, in ms")
+    args = parser.parse_args()
+
+    for name, profile in (("rollback journal", False), ("WAL profile", True)):
+        # A fresh process per mode, so the order number allocator holds no
+        # block reserved in the previous mode's database
+        with ProcessPoolExecutor(1) as executor:
+            result = executor.submit(run, profile, args.writers, args.orders, args.readers, args.read_interval / 1000).result()
+        print(
+            f"{name:>16}: {result['elapsed']:.2f}s, {result['orders/s']:.0f} orders/s, "
+            f"{result['failed']} of {result['attempts']} writes failed"
+            + (f"; {result['reads']} reads, p50 {result['read p50']:.1f} ms, p99 {result['read p99']:.1f} ms" if args.readers else "")
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Fail if the order list issues more statements as the page grows.
+
+Builds throwaway SQLite databases with 1, 10 and 50 orders, each from its
+own customer, and counts the statements crud_get_order_list and the
+response serialization execute for a full page. An N+1 (say, a lazy
+Order.customer load per row) shows up as a count that grows with the page.
+
+Usage: python -m scripts.check_query_counts
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from typing import Callable
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from database import Base, engine_options
+from crud.order import crud_get_order_list
+from models.customer import Customer
+from models.order import Order
+from models import product, sequence, user  # noqa: F401
+from models.user import User
+from utils.pagination import Cursor
+from utils.serialization import model_response, order_list_adapter
+
+PAGE_SIZES = (1, 10, 50)
+
+
+def seed(db: Session, orders: int) -> int:
+    owner = User(email="owner@example.com", name="Owner", hashed_password="x")
+    db.add(owner)
+    db.flush()
+    start = datetime.utcnow()
+    for number in range(orders):
+        customer = Customer(first_name="Customer", last_name=str(number), email=f"customer{number}@example.com")
+        db.add(Order(
+            order_number=f"ORD-{number + 1:05d}",
+            customer=customer,
+            amount=10,
+            payment_method="UPI",
+            user_id=owner.id,
+            created_at=start + timedelta(seconds=number),
+        ))
+    db.commit()
+    return owner.id
+
+
+def count_statements(db: Session, fn: Callable[[], object]) -> int:
+    count = 0
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        nonlocal count
+        count += 1
+
+    bind = db.get_bind()
+    event.listen(bind, "before_cursor_execute", record)
+    try:
+        fn()
+    finally:
+        event.remove(bind, "before_cursor_execute", record)
+    return count
+
+
+def measure(orders: int) -> dict:
+    """Statement counts for an offset page and a cursor page of ``orders`` rows."""
+    scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    scratch.close()
+    url = f"sqlite:///{scratch.name}"
+    engine = create_engine(url, **engine_options(url))
+    try:
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as db:
+            user_id = seed(db, orders)
+
+        counts = {}
+        with Session(engine) as db:
+            def offset_page():
+                page = crud_get_order_list(db, user_id, limit=orders)
+                assert len(page.items) == orders, f"expected {orders} rows, got {len(page.items)}"
+                model_response(order_list_adapter, page.items)
+            counts["offset page"] = count_statements(db, offset_page)
+
+        with Session(engine) as db:
+            def cursor_page():
+                # Positioned after the newest order, so the page is every order
+                page = crud_get_order_list(db, user_id, limit=orders, cursor=Cursor(datetime.utcnow() + timedelta(days=1), 0))
+                assert len(page.items) == orders, f"expected {orders} rows, got {len(page.items)}"
+                model_response(order_list_adapter, page.items)
+            counts["cursor page"] = count_statements(db, cursor_page)
+        return counts
+    finally:
+        engine.dispose()
+        os.unlink(scratch.name)
+
+
+def main() -> int:
+    results = {orders: measure(orders) for orders in PAGE_SIZES}
+    failures = 0
+    for shape in results[PAGE_SIZES[0]]:
+        counts = [results[orders][shape] for orders in PAGE_SIZES]
+        constant = len(set(counts)) == 1
+        print(f"{'ok  ' if constant else 'FAIL'} order list, {shape}: " + ", ".join(
+            f"{orders} rows -> {count} statement(s)" for orders, count in zip(PAGE_SIZES, counts)
+        ))
+        failures += not constant
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Fail if any hot query plans a full table scan.
+
+Runs the read paths the API serves most against the configured database,
+captures the SQL they emit and asks the database for each plan.
+
+SQLite: a plain ``SCAN <table>`` or an ``AUTOMATIC`` index (one SQLite
+builds because no usable index exists) is a failure. ``SCAN ... USING
+INDEX`` is fine; it walks an index in order for a LIMITed page.
+
+PostgreSQL: sequential scans are disabled for the session, so a
+``Seq Scan`` left in the plan means no index can serve the query.
+
+Usage: python -m scripts.check_query_plans
+"""
+import re
+import sys
+from datetime import datetime
+from typing import List, Tuple
+
+from sqlalchemy import event
+
+from database import Base, SessionLocal, engine
+from migrations import run_migrations
+from models import order, product, sequence, user  # noqa: F401
+from utils.pagination import Cursor
+from crud.order import crud_filter_orders, crud_get_order_by_orderNumber, crud_get_order_list, crud_get_orders
+from crud.invoice import get_invoice_by_order, get_invoices
+from crud.address import get_address_by_order
+from crud.customer import get_customer_by_email
+from crud.product import get_products
+
+# (name, callable) pairs; each runs one hot read path
+HOT_QUERIES = [
+    ("order list", lambda db: crud_get_order_list(db, 1)),
+    ("order list, cursor", lambda db: crud_get_order_list(db, 1, cursor=Cursor(datetime.utcnow(), 0))),
+    ("orders by user", lambda db: crud_get_orders(db, 1)),
+    ("orders by status", lambda db: crud_filter_orders(db, 1, status="PENDING")),
+    ("orders by customer name", lambda db: crud_filter_orders(db, 1, customer_name="john")),
+    ("order detail", lambda db: crud_get_order_by_orderNumber(db, "ORD-00001", 1)),
+    ("invoice by order", lambda db: get_invoice_by_order(db, 1)),
+    ("invoice list, cursor", lambda db: get_invoices(db, cursor=Cursor(datetime.utcnow(), 0))),
+    ("address by order", lambda db: get_address_by_order(db, 1)),
+    ("customer by email", lambda db: get_customer_by_email(db, "john.doe@example.com")),
+    ("product list, cursor", lambda db: get_products(db, cursor=Cursor(datetime.utcnow(), 0))),
+]
+
+TABLES = set(Base.metadata.tables)
+
+
+def capture(fn) -> List[Tuple[str, object]]:
+    """Run ``fn`` in a session and return the SELECT statements it executed."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    db = SessionLocal()
+    try:
+        fn(db)
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+
+def full_scans(statement: str, parameters) -> List[str]:
+    with engine.connect() as connection:
+        if engine.dialect.name == "sqlite":
+            rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            details = [row[-1] for row in rows]
+            return [
+                detail for detail in details
+                if "AUTOMATIC" in detail
+                or (re.match(r"SCAN (\w+)$", detail) and detail.split()[1] in TABLES)
+            ]
+        connection.exec_driver_sql("SET enable_seqscan = off")
+        rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).all()
+        return [row[0].strip() for row in rows if "Seq Scan" in row[0]]
+
+
+def main() -> int:
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    failures = 0
+    for name, fn in HOT_QUERIES:
+        problems = []
+        for statement, parameters in capture(fn):
+            problems.extend(full_scans(statement, parameters))
+        print(f"{'FAIL' if problems else 'ok  '} {name}")
+        for problem in problems:
+            print(f"       {problem}")
+        failures += bool(problems)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
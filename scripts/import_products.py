@@ -0,0 +1,50 @@
+"""Bulk-load products from a JSON Lines or CSV feed straight into the database.
+
+Usage:
+    python -m scripts.import_products feed.jsonl
+    python -m scripts.import_products feed.csv
+    cat feed.csv | python -m scripts.import_products - --format csv
+
+Rows are upserted on permalink in chunks; invalid rows are reported and
+skipped.
+"""
+import argparse
+import io
+import json
+import sys
+
+from config import settings
+from crud.product_import import FORMATS, import_products
+from database import SessionLocal
+# Register every mapped class so the Product mapper can configure
+from models import order, product, sequence, user  # noqa: F401
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Upsert products from a JSONL or CSV feed")
+    parser.add_argument("path", help="Feed file, or - for stdin")
+    parser.add_argument("--format", choices=FORMATS, help="Defaults from the file extension")
+    parser.add_argument("--chunk-size", type=int, default=settings.PRODUCT_IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    format = args.format or ("csv" if args.path.endswith(".csv") else "jsonl")
+    if args.path == "-":
+        feed = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    else:
+        feed = open(args.path, encoding="utf-8", newline="")
+
+    db = SessionLocal()
+    try:
+        with feed:
+            result = import_products(db, feed, format, args.chunk_size)
+    finally:
+        db.close()
+
+    print(f"Received {result['received']}, upserted {result['upserted']}, failed {result['failed']}")
+    for error in result["errors"]:
+        print(json.dumps(error), file=sys.stderr)
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
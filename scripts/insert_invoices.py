@@ -1,73 +1,31 @@
-from sqlalchemy.orm import Session
-from database import SessionLocal
-from models.invoice import Invoice
-from models.order import Order
-from models.customer import Customer
-from datetime import datetime
-import random
+"""Create the missing invoices for existing orders.
 
-def insert_default_invoices():
-    db = SessionLocal()
-    
-    try:
-        # Create some sample customers if they don't exist
-        customers = [
-            {
-                "first_name": "John",
-                "last_name": "Doe",
-                "email": "john.doe@example.com",
-                "phone_country_code": "+1",
-                "phone_number": "555-0123"
-            },
-            {
-                "first_name": "Jane",
-                "last_name": "Smith",
-                "email": "jane.smith@example.com",
-                "phone_country_code": "+1",
-                "phone_number": "555-0124"
-            }
-        ]
+Usage:
+    python -m scripts.insert_invoices                  # every uninvoiced order
+    python -m scripts.insert_invoices --incremental    # orders after the last invoiced one
+    python -m scripts.insert_invoices --since 1200     # orders with id > 1200
+"""
+import argparse
 
-        # Get existing orders
-        orders = db.query(Order).all()
-        
-        # Create invoices for existing orders
-        for order in orders:
-            # Get or create customer
-            customer = db.query(Customer).filter(
-                Customer.email == order.customer.email
-            ).first()
-            if not customer:
-                customer = Customer(
-                    first_name=order.customer.first_name,
-                    last_name=order.customer.last_name,
-                    email=order.customer.email,
-                    phone_country_code=order.customer.phone_country_code,
-                    phone_number=order.customer.phone_number
-                )
-                db.add(customer)
-                db.commit()
-                db.refresh(customer)
+from database import SessionLocal
+from crud.invoice import generate_invoices
+# Register every mapped class before the first query
+from models import order, product, sequence, user  # noqa: F401
 
-            # Create invoice
-            invoice = Invoice(
-                invoice_number=f"INV-{order.id:05d}",
-                customer_name=f"{customer.first_name} {customer.last_name}",
-                order_id=order.id,
-                amount=order.amount,
-                status=order.status,
-                issued_date=order.order_date
-            )
-            db.add(invoice)
 
-        db.commit()
-        print("Default invoices created successfully!")
-    
-    except Exception as e:
-        db.rollback()
+def insert_default_invoices(incremental: bool = False, since_order_id: int = None):
+    db = SessionLocal()
+    try:
+        result = generate_invoices(db, incremental, since_order_id)
+        print(f"Created {result['created']} invoice(s); last invoiced order id: {result['watermark']}")
+    except ValueError as e:
         print(f"Error creating invoices: {str(e)}")
     finally:
         db.close()
 
 if __name__ == "__main__":
-    insert_default_invoices()
+    parser = argparse.ArgumentParser(description="Create invoices for uninvoiced orders")
+    parser.add_argument("--incremental", action="store_true", help="Only orders newer than the last invoiced order")
+    parser.add_argument("--since", type=int, dest="since_order_id", help="Only orders with a higher id")
+    args = parser.parse_args()
+    insert_default_invoices(args.incremental, args.since_order_id)
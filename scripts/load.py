@@ -0,0 +1,19 @@
+"""Helpers for the scripts that load a running server over HTTP."""
+from typing import Dict, List
+
+import httpx
+
+
+async def sign_in(client: httpx.AsyncClient, email: str, password: str) -> Dict[str, str]:
+    """Authorization headers for ``email``, signed in through /auth/signin."""
+    response = await client.post("/auth/signin", data={"username": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def percentile(timings: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of ``timings``; 0 when there are none."""
+    if not timings:
+        return 0.0
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
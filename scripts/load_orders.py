@@ -0,0 +1,70 @@
+"""Load a running server with many concurrent clients and report req/s.
+
+Signs in once, then runs --clients concurrent httpx.AsyncClient loops
+against --path (the order list by default) for --duration seconds. Prints
+requests per second, p50/p99 latency and the status codes seen. Start the
+app first, e.g. ``uvicorn main:app --port 8000``.
+
+To compare with the old synchronous-session routers, run the same command
+against a server started from a checkout of that commit.
+
+Usage: python -m scripts.load_orders [--base-url http://127.0.0.1:8000] [--clients 100] [--duration 10]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+from config import settings
+from scripts.load import percentile, sign_in
+
+
+async def run(args) -> int:
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        headers = await sign_in(client, args.email, args.password)
+        timings = []
+        statuses = Counter()
+        deadline = time.perf_counter() + args.duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(args.path, headers=headers)
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                    continue
+                timings.append((time.perf_counter() - start) * 1000)
+                statuses[response.status_code] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.clients)))
+        elapsed = time.perf_counter() - started
+
+    print(
+        f"{len(timings)} requests to {args.path} from {args.clients} clients in {elapsed:.1f}s: "
+        f"{len(timings) / elapsed:.0f} req/s, p50 {percentile(timings, 0.5):.1f} ms, p99 {percentile(timings, 0.99):.1f} ms"
+    )
+    for status, count in sorted(statuses.items(), key=str):
+        print(f"  {count} x {status}")
+    return 0 if set(statuses) == {200} else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent-client load test against a running server")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--path", default="/orders/list")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10, help="Seconds to run")
+    parser.add_argument("--email", default=settings.ADMIN_EMAIL)
+    parser.add_argument("--password", default=settings.ADMIN_PASSWORD)
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
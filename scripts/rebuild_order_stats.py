@@ -0,0 +1,21 @@
+"""Recompute the order_stats summary table from the orders table.
+
+Usage: python -m scripts.rebuild_order_stats
+"""
+from database import SessionLocal
+from crud.order_stats import rebuild_order_stats
+# Register every mapped class before the first query
+from models import order, order_stat, product, sequence, user  # noqa: F401
+
+
+def main():
+    db = SessionLocal()
+    try:
+        print(f"Rebuilt order stats: {rebuild_order_stats(db)} bucket(s)")
+    except ValueError as e:
+        print(f"Error rebuilding order stats: {str(e)}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Throwaway databases for the benchmark and stress scripts."""
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+from database import Base, apply_sqlite_profile, engine_options
+# Register every table on Base.metadata
+from models import email_outbox, idempotency_key, order, order_stat, product, product_stock_shard, sequence, user  # noqa: F401
+
+
+def make_engine(url: str, sqlite_profile: bool = True) -> Engine:
+    engine = create_engine(url, **engine_options(url))
+    if engine.dialect.name == "sqlite" and sqlite_profile:
+        apply_sqlite_profile(engine)
+    return engine
+
+
+@contextmanager
+def scratch_engine(url: Optional[str] = None, sqlite_profile: bool = True) -> Iterator[Engine]:
+    """Engine with every table created, on ``url`` or on a temporary SQLite file.
+
+    The temporary file (with its WAL files) is removed afterwards; a given
+    ``url`` is left as it is.
+    """
+    path = None
+    if url is None:
+        handle, path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        url = f"sqlite:///{path}"
+    engine = make_engine(url, sqlite_profile)
+    try:
+        Base.metadata.create_all(bind=engine)
+        yield engine
+    finally:
+        engine.dispose()
+        if path is not None:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.unlink(path + suffix)
@@ -0,0 +1,185 @@
+"""Stress concurrent checkouts of one SKU and fail on any oversell.
+
+Many threads call crud_create_order at once for a product with little
+stock, some orders also taking a second product so rows are locked in
+both orders. Afterwards stock must not be negative, the units on order
+lines must equal the stock taken, and no more than the initial stock may
+have been sold. The run is timed and reported as attempts/s and
+successful checkouts/s.
+
+Runs against a throwaway SQLite file unless --database-url is given. With
+STOCK_SHARDING_ENABLED=true and --shards N, the hot product's stock is
+split over N shards first; --compare-shards N runs the same workload
+unsharded and then with N shards, each on a fresh database. To compare
+throughput under heavy contention, with enough stock that checkouts do
+not simply run out:
+
+    STOCK_SHARDING_ENABLED=true python -m scripts.stress_checkout \\
+        --threads 200 --orders 5 --stock 10000 --compare-shards 8
+
+Usage: python -m scripts.stress_checkout [--stock 50] [--threads 16] [--orders 20] [--shards N | --compare-shards N]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from config import settings
+from crud.inventory import set_stock_shards
+from crud.order import crud_create_order
+from database import Base, apply_sqlite_profile, engine_options
+from models import email_outbox, idempotency_key, order, order_stat, product, product_stock_shard, sequence, user  # noqa: F401
+from models.order_product import OrderProduct
+from models.product import Product
+from models.product_stock_shard import ProductStockShard
+from models.user import User
+from schemas.combined import OrderCreateCombined
+
+
+def make_engine(url: str):
+    engine = create_engine(url, **engine_options(url))
+    if engine.dialect.name == "sqlite":
+        apply_sqlite_profile(engine)
+    return engine
+
+
+def seed(db: Session, stock: int, shards: int):
+    owner = User(email="owner@example.com", name="Owner", hashed_password="x")
+    hot = Product(product_name="Hot", permalink="stress-hot", regular_price=10, stock_quantity=stock)
+    other = Product(product_name="Other", permalink="stress-other", regular_price=5, stock_quantity=stock * 100)
+    db.add_all([owner, hot, other])
+    db.commit()
+    if shards:
+        set_stock_shards(db, hot.id, shards)
+    return owner.id, hot.id, other.id
+
+
+def stock_of(db: Session, product_id: int) -> int:
+    """Units left, counting shards when the product has them."""
+    sharded = db.execute(
+        select(func.sum(ProductStockShard.quantity)).where(ProductStockShard.product_id == product_id)
+    ).scalar()
+    if sharded is not None:
+        return sharded
+    return db.execute(select(Product.stock_quantity).where(Product.id == product_id)).scalar_one()
+
+
+def run(args, shards: int) -> List[str]:
+    """One stress run with the hot product split over ``shards`` shards; returns the problems found."""
+    scratch = None
+    url = args.database_url
+    if url is None:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        scratch.close()
+        url = f"sqlite:///{scratch.name}"
+
+    engine = make_engine(url)
+    try:
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as db:
+            user_id, hot, other = seed(db, args.stock, shards)
+
+        placed = []
+        failures = Counter()
+        lock = threading.Lock()
+
+        def checkout(attempt: int) -> None:
+            quantity = random.randint(1, 3)
+            products = [{"product_id": hot, "quantity": quantity}]
+            if attempt % 2:
+                # Take the other product first, so row locks are requested in both orders
+                products.insert(0, {"product_id": other, "quantity": 1})
+            order_data = OrderCreateCombined.model_validate({
+                "customer": {"first_name": "Stress", "last_name": str(attempt), "email": f"stress{attempt}@example.com"},
+                "shipping_address": {"city": "Stress"},
+                "payment_method": "UPI",
+                "products": products,
+            })
+            with Session(engine) as db:
+                try:
+                    crud_create_order(db, order_data, user_id)
+                except ValueError as e:
+                    with lock:
+                        failures[str(e)] += 1
+                    return
+            with lock:
+                placed.append(quantity)
+
+        # crud_create_order prints a traceback for every rejected order
+        with contextlib.redirect_stderr(io.StringIO()), ThreadPoolExecutor(args.threads) as pool:
+            start = time.perf_counter()
+            list(pool.map(checkout, range(args.threads * args.orders)))
+            elapsed = time.perf_counter() - start
+
+        with Session(engine) as db:
+            remaining = stock_of(db, hot)
+            sold = db.execute(
+                select(func.coalesce(func.sum(OrderProduct.quantity), 0)).where(OrderProduct.product_id == hot)
+            ).scalar_one()
+    finally:
+        engine.dispose()
+        if scratch is not None:
+            os.unlink(scratch.name)
+
+    attempts = args.threads * args.orders
+    print(
+        f"{f'{shards} shards' if shards else 'unsharded'}: "
+        f"{len(placed)} of {attempts} checkouts succeeded in {elapsed:.2f}s "
+        f"({attempts / elapsed:.0f} attempts/s, {len(placed) / elapsed:.0f} checkouts/s); "
+        f"sold {sold} of {args.stock} units, {remaining} left"
+    )
+    for reason, count in failures.most_common():
+        print(f"  {count} rejected: {reason}")
+    problems = []
+    if remaining < 0:
+        problems.append(f"stock went negative ({remaining})")
+    if sold > args.stock:
+        problems.append(f"sold {sold} units with only {args.stock} in stock")
+    if sold != args.stock - remaining:
+        problems.append(f"{sold} units on order lines but {args.stock - remaining} taken from stock")
+    if sold != sum(placed):
+        problems.append(f"{sold} units on order lines but {sum(placed)} reported as placed")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check that concurrent checkouts never oversell")
+    parser.add_argument("--database-url", help="Defaults to a temporary SQLite file")
+    parser.add_argument("--stock", type=int, default=50, help="Initial stock of the hot product")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--orders", type=int, default=20, help="Checkouts attempted per thread")
+    parser.add_argument("--shards", type=int, default=0, help="Shard the hot product's stock (needs STOCK_SHARDING_ENABLED)")
+    parser.add_argument(
+        "--compare-shards", type=int, metavar="N",
+        help="Run unsharded and then with N shards, and report both (needs STOCK_SHARDING_ENABLED)",
+    )
+    args = parser.parse_args()
+    if (args.shards or args.compare_shards) and not settings.STOCK_SHARDING_ENABLED:
+        parser.error("sharding needs STOCK_SHARDING_ENABLED=true")
+    if args.compare_shards and args.database_url:
+        parser.error("--compare-shards needs a fresh database for each run; leave out --database-url")
+
+    problems = []
+    for shards in ([0, args.compare_shards] if args.compare_shards else [args.shards]):
+        # A fresh process per run, so the order number allocator and caches
+        # hold nothing from the previous run's database
+        with ProcessPoolExecutor(1) as executor:
+            problems += executor.submit(run, args, shards).result()
+    for problem in problems:
+        print(f"FAIL {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""Drain a large email outbox through the worker and fail on any unsent row.
+
+Starts a minimal SMTP sink on SMTP_HOST:SMTP_PORT, queues --messages
+outbox rows in a throwaway SQLite file and runs email_worker (claims,
+SMTP connection pool and all) until the outbox is empty. Prints mails/s,
+and fails unless every row is marked sent and the sink received each
+message exactly once.
+
+The sink speaks plain SMTP with AUTH PLAIN, so run with
+SMTP_STARTTLS=false.
+
+Usage: SMTP_STARTTLS=false python -m scripts.stress_email_outbox [--messages 10000]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from config import settings
+from database import AsyncSessionLocal, apply_sqlite_profile, async_database_url, engine_options
+from models.email_outbox import EmailOutbox
+from scripts.scratch import scratch_engine
+from utils.email_service import email_worker
+
+
+class SMTPSink:
+    """Accepts every message and counts them by Subject."""
+
+    def __init__(self):
+        self.received = Counter()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        def reply(line: str) -> None:
+            writer.write(line.encode() + b"\r\n")
+
+        reply("220 sink ESMTP")
+        while line := await reader.readline():
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                reply("250-sink\r\n250-8BITMIME\r\n250 AUTH PLAIN")
+            elif command.startswith("AUTH"):
+                reply("235 Authentication succeeded")
+            elif command == "DATA":
+                reply("354 End data with <CR><LF>.<CR><LF>")
+                subject = None
+                while (data := await reader.readline()) not in (b".\r\n", b""):
+                    if data.startswith(b"Subject: "):
+                        subject = data[len(b"Subject: "):].decode().strip()
+                self.received[subject] += 1
+                reply("250 OK")
+            elif command == "QUIT":
+                reply("221 Bye")
+                await writer.drain()
+                break
+            else:
+                # MAIL, RCPT, RSET, NOOP
+                reply("250 OK")
+            await writer.drain()
+        writer.close()
+
+
+async def drain(sink: SMTPSink, timeout: float) -> float:
+    server = await asyncio.start_server(sink.handle, settings.SMTP_HOST, settings.SMTP_PORT)
+    async with server:
+        email_worker.start()
+        start = time.perf_counter()
+        try:
+            while True:
+                async with AsyncSessionLocal() as db:
+                    pending = (await db.execute(
+                        select(func.count()).select_from(EmailOutbox).where(EmailOutbox.status == "pending")
+                    )).scalar_one()
+                # A failed send stays pending with a backoff; give up rather than wait it out
+                if not pending or time.perf_counter() - start > timeout:
+                    break
+                await asyncio.sleep(0.05)
+            return time.perf_counter() - start
+        finally:
+            await email_worker.stop()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Drain the email outbox through the worker against an SMTP sink")
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds to wait for the outbox to empty")
+    args = parser.parse_args()
+    if settings.SMTP_STARTTLS:
+        parser.error("the SMTP sink does not speak TLS; run with SMTP_STARTTLS=false")
+
+    sink = SMTPSink()
+    with scratch_engine() as engine:
+        with engine.begin() as conn:
+            conn.execute(insert(EmailOutbox), [
+                {"to_email": f"stress{number}@example.com", "subject": f"Stress {number}", "body": "Hello"}
+                for number in range(args.messages)
+            ])
+        url = async_database_url(engine.url.render_as_string(hide_password=False))
+        async_engine = create_async_engine(url, **engine_options(url))
+        apply_sqlite_profile(async_engine.sync_engine)
+        # The worker opens its sessions from AsyncSessionLocal
+        AsyncSessionLocal.configure(bind=async_engine)
+        try:
+            elapsed = asyncio.run(drain(sink, args.timeout))
+        finally:
+            asyncio.run(async_engine.dispose())
+        with engine.connect() as conn:
+            statuses = dict(conn.execute(
+                select(EmailOutbox.status, func.count()).group_by(EmailOutbox.status)
+            ).all())
+
+    print(
+        f"Sent {statuses.get('sent', 0)} of {args.messages} messages in {elapsed:.2f}s: "
+        f"{statuses.get('sent', 0) / elapsed:.0f} mails/s "
+        f"(batch {settings.EMAIL_BATCH_SIZE}, {settings.EMAIL_SMTP_POOL_SIZE} SMTP connections)"
+    )
+    problems = []
+    if statuses.get("sent", 0) != args.messages:
+        problems.append(f"rows by status: {statuses}")
+    duplicates = sum(count - 1 for count in sink.received.values() if count > 1)
+    if duplicates:
+        problems.append(f"{duplicates} messages were delivered more than once")
+    if len(sink.received) != args.messages:
+        problems.append(f"the sink received {len(sink.received)} distinct messages")
+    for problem in problems:
+        print(f"FAIL {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
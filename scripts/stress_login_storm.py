@@ -0,0 +1,88 @@
+"""Check that order requests keep their p99 during a burst of logins.
+
+Against a running server, first polls /orders/list from --readers clients
+for --duration seconds to get a baseline, then does the same while
+--logins clients hammer /auth/signin. Prints the order p50/p99 for both
+phases and the status codes the sign-ins got (503 means the bcrypt pool
+turned the login away). Start the app first, e.g.
+``uvicorn main:app --port 8000``.
+
+Usage: python -m scripts.stress_login_storm [--base-url http://127.0.0.1:8000] [--logins 50] [--readers 10]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+from config import settings
+from scripts.load import percentile, sign_in
+
+
+async def poll_orders(client: httpx.AsyncClient, headers, deadline: float, timings, statuses) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get("/orders/list", headers=headers)
+        timings.append((time.perf_counter() - start) * 1000)
+        statuses[response.status_code] += 1
+
+
+async def sign_in_repeatedly(client: httpx.AsyncClient, args, deadline: float, statuses) -> None:
+    while time.perf_counter() < deadline:
+        response = await client.post("/auth/signin", data={"username": args.email, "password": args.password})
+        statuses[response.status_code] += 1
+        if response.status_code == 503:
+            # Back off briefly so rejected logins do not spin on the event loop
+            await asyncio.sleep(0.05)
+
+
+async def phase(args, headers, storm: bool):
+    timings = []
+    order_statuses = Counter()
+    login_statuses = Counter()
+    limits = httpx.Limits(max_connections=args.readers + args.logins)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + args.duration
+        tasks = [poll_orders(client, headers, deadline, timings, order_statuses) for _ in range(args.readers)]
+        if storm:
+            tasks += [sign_in_repeatedly(client, args, deadline, login_statuses) for _ in range(args.logins)]
+        await asyncio.gather(*tasks)
+    return timings, order_statuses, login_statuses
+
+
+async def run(args) -> int:
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        headers = await sign_in(client, args.email, args.password)
+
+    problems = []
+    for name, storm in (("baseline", False), (f"{args.logins} logins", True)):
+        timings, order_statuses, login_statuses = await phase(args, headers, storm)
+        print(
+            f"{name:>12}: {len(timings)} order requests, "
+            f"p50 {percentile(timings, 0.5):.1f} ms, p99 {percentile(timings, 0.99):.1f} ms"
+        )
+        if login_statuses:
+            print("              sign-ins: " + ", ".join(f"{count} x {code}" for code, count in sorted(login_statuses.items())))
+        if set(order_statuses) != {200}:
+            problems.append(f"{name}: order requests got {dict(order_statuses)}")
+    for problem in problems:
+        print(f"FAIL {problem}")
+    return 1 if problems else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Order latency during a login storm")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--logins", type=int, default=50, help="Concurrent sign-in clients during the storm")
+    parser.add_argument("--readers", type=int, default=10, help="Concurrent /orders/list clients")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per phase")
+    parser.add_argument("--email", default=settings.ADMIN_EMAIL)
+    parser.add_argument("--password", default=settings.ADMIN_PASSWORD)
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
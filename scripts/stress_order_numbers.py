@@ -0,0 +1,91 @@
+"""Stress the order number allocator and fail on any duplicate.
+
+Several processes, each with its own BlockAllocator and several threads,
+draw values from one shared ``sequences`` row, the way uvicorn workers
+allocate order numbers. Every value drawn must be unique.
+
+Runs against a throwaway SQLite file unless --database-url is given; the
+allocator uses its own sequence name, so order numbering is not touched.
+
+Usage: python -m scripts.stress_order_numbers [--processes 4] [--threads 8] [--draws 500]
+"""
+import argparse
+import os
+import sys
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
+from typing import List
+
+from sqlalchemy import create_engine, delete
+
+from crud.sequence import BlockAllocator
+from database import apply_sqlite_profile, engine_options
+from models.sequence import Sequence
+
+SEQUENCE_NAME = "stress_order_number"
+
+
+def make_engine(url: str):
+    engine = create_engine(url, **engine_options(url))
+    if engine.dialect.name == "sqlite":
+        apply_sqlite_profile(engine)
+    return engine
+
+
+def draw(url: str, threads: int, draws: int, block_size: int) -> List[int]:
+    """One worker process: ``threads`` threads drawing ``draws`` values each."""
+    engine = make_engine(url)
+    allocator = BlockAllocator(SEQUENCE_NAME, block_size, initial_value=lambda conn: 1)
+    try:
+        with ThreadPoolExecutor(threads) as pool:
+            batches = pool.map(lambda _: [allocator.next_value(engine) for _ in range(draws)], range(threads))
+            return [value for batch in batches for value in batch]
+    finally:
+        engine.dispose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check that concurrent order number allocation never repeats")
+    parser.add_argument("--database-url", help="Defaults to a temporary SQLite file")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--draws", type=int, default=500, help="Values drawn per thread")
+    parser.add_argument("--block-size", type=int, default=10)
+    args = parser.parse_args()
+
+    scratch = None
+    url = args.database_url
+    if url is None:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        scratch.close()
+        url = f"sqlite:///{scratch.name}"
+
+    engine = make_engine(url)
+    try:
+        Sequence.__table__.create(bind=engine, checkfirst=True)
+        with engine.begin() as conn:
+            conn.execute(delete(Sequence).where(Sequence.name == SEQUENCE_NAME))
+
+        with Pool(args.processes) as pool:
+            results = pool.starmap(draw, [(url, args.threads, args.draws, args.block_size)] * args.processes)
+        values = [value for result in results for value in result]
+
+        with engine.begin() as conn:
+            conn.execute(delete(Sequence).where(Sequence.name == SEQUENCE_NAME))
+    finally:
+        engine.dispose()
+        if scratch is not None:
+            os.unlink(scratch.name)
+
+    expected = args.processes * args.threads * args.draws
+    duplicates = {value: count for value, count in Counter(values).items() if count > 1}
+    print(f"Drew {len(values)} of {expected} values, {len(set(values))} unique, {len(duplicates)} duplicated")
+    if duplicates:
+        print(f"Duplicated: {sorted(duplicates)[:20]}")
+    return 1 if duplicates or len(values) != expected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,40 @@
+from dataclasses import dataclass
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from database import SessionLocal
+from config import settings
+from database import AsyncSessionLocal, SessionLocal
 from models.user import User
+from utils.cache import TTLCache
 from utils.jwt_handler import verify_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/signin")
 
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Detached snapshot of the authenticated user, safe to share across requests."""
+    id: int
+    email: str
+    name: str
+    is_active: bool
+
+
+# Keyed by token subject (email). Entries are dropped whenever the user row
+# changes in this process; other workers catch up within the TTL.
+user_cache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    user_cache.delete(target.email)
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -15,7 +42,11 @@ def get_db():
     finally:
         db.close()
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -28,8 +59,13 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     if email is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.email == email).first()
+    user = user_cache.get(email)
     if user is None:
-        raise credentials_exception
+        result = await db.execute(select(User).filter(User.email == email))
+        row = result.scalars().first()
+        if row is None:
+            raise credentials_exception
+        user = CurrentUser(id=row.id, email=row.email, name=row.name, is_active=row.is_active)
+        user_cache.set(email, user)
 
     return user
\ No newline at end of file
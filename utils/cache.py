@@ -0,0 +1,173 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from config import settings
+
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU cache whose entries expire after ``ttl`` seconds.
+
+    ``delete`` and ``clear`` bump a generation, so a read-through fill that
+    loaded its value before an invalidation can pass the generation it saw
+    to ``set`` and be dropped instead of caching stale data.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Invalidations per key, and of the whole cache
+        self._generations: Dict[Hashable, int] = {}
+        self._epoch = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def generation(self, key: Hashable) -> Tuple[int, int]:
+        """Token to read before loading ``key``'s value and pass to ``set``."""
+        with self._lock:
+            return self._epoch, self._generations.get(key, 0)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, generation: Optional[Tuple[int, int]] = None) -> None:
+        """Store ``value``; ``ttl`` overrides the cache default for this entry.
+
+        With ``generation``, the value is dropped if ``key`` was invalidated
+        since that token was read.
+        """
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations.get(key, 0)):
+                return
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class RedisCache:
+    """TTLCache-compatible cache stored in Redis, shared by every worker.
+
+    Values must be JSON-serializable. Redis enforces size with its own
+    eviction policy, so ``maxsize`` is informational only. Generations live
+    in Redis too, so an invalidation by any worker drops stale fills in all
+    of them.
+    """
+
+    def __init__(self, url: str, namespace: str, maxsize: int, ttl: float):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = f"{namespace}:"
+        # Outside the value prefix, so clear() does not reset them
+        self.generation_prefix = f"{namespace}#generation:"
+        self.epoch_key = f"{namespace}#epoch"
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        raw = self.client.get(self.prefix + str(key))
+        if raw is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(raw)
+
+    def _generation_keys(self, key: Hashable) -> Tuple[str, str]:
+        return self.epoch_key, self.generation_prefix + str(key)
+
+    def generation(self, key: Hashable) -> Tuple[Optional[bytes], Optional[bytes]]:
+        return tuple(self.client.mget(self._generation_keys(key)))
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, generation: Optional[tuple] = None) -> None:
+        from redis.exceptions import WatchError
+
+        seconds = max(1, int(self.ttl if ttl is None else ttl))
+        if generation is None:
+            self.client.set(self.prefix + str(key), json.dumps(value), ex=seconds)
+            return
+        # Write only if no invalidation happened since ``generation`` was
+        # read, including one that races with this check
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(*self._generation_keys(key))
+                if tuple(pipe.mget(self._generation_keys(key))) != tuple(generation):
+                    return
+                pipe.multi()
+                pipe.set(self.prefix + str(key), json.dumps(value), ex=seconds)
+                pipe.execute()
+            except WatchError:
+                pass
+
+    def delete(self, key: Hashable) -> None:
+        generation_key = self.generation_prefix + str(key)
+        with self.client.pipeline() as pipe:
+            pipe.delete(self.prefix + str(key))
+            pipe.incr(generation_key)
+            # Only has to outlive fills that started before this delete
+            pipe.expire(generation_key, max(60, int(self.ttl) * 2))
+            pipe.execute()
+
+    def clear(self) -> None:
+        self.client.incr(self.epoch_key)
+        keys = list(self.client.scan_iter(match=self.prefix + "*", count=500))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def make_cache(namespace: str, maxsize: int, ttl: float):
+    """Build a shared Redis cache when CACHE_REDIS_URL is set, else an in-process one."""
+    if settings.CACHE_REDIS_URL:
+        return RedisCache(settings.CACHE_REDIS_URL, namespace, maxsize, ttl)
+    return TTLCache(maxsize=maxsize, ttl=ttl)
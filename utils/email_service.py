@@ -1,24 +1,214 @@
-import smtplib
-from email.message import EmailMessage
-import os
-from dotenv import load_dotenv
-import os
-
-load_dotenv(verbose=True)
-
-SMTP_HOST = os.getenv("SMTP_HOST")
-SMTP_PORT = os.getenv("SMTP_PORT")
-SMTP_USER = os.getenv("SMTP_USER")
-SMTP_PASS = os.getenv("SMTP_PASS")
-
-def send_email(to_email: str, subject: str, body: str):
-    msg = EmailMessage()
-    msg["From"] = SMTP_USER
-    msg["To"] = to_email
-    msg["Subject"] = subject
-    msg.set_content(body)
-    # import pdb;pdb.set_trace()
-    with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-        server.starttls()
-        server.login(SMTP_USER, SMTP_PASS)
-        server.send_message(msg)
+"""Outbound mail.
+
+Messages are written to the ``email_outbox`` table in the caller's
+transaction and delivered by ``email_worker``, an asyncio task started in
+the app lifespan. The worker claims due rows in batches, sends them
+concurrently over a small pool of authenticated SMTP connections that stay
+open between batches, and reschedules failures with exponential backoff.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from email.mime.text import MIMEText
+from typing import List, Optional, Tuple
+
+import aiosmtplib
+from sqlalchemy import select, update
+
+from config import settings
+from database import AsyncSessionLocal
+from models.email_outbox import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+# Reused connections idle longer than this are checked with NOOP first
+IDLE_CHECK_SECONDS = 30
+
+
+def enqueue_email(db, to_email: str, subject: str, body: str) -> EmailOutbox:
+    """Queue a message on ``db`` (sync or async session); it is sent once the caller commits."""
+    message = EmailOutbox(to_email=to_email, subject=subject, body=body)
+    db.add(message)
+    return message
+
+
+class SMTPPool:
+    """Up to ``size`` authenticated SMTP connections, kept open and reused."""
+
+    def __init__(self, size: int):
+        self._slots = asyncio.Semaphore(size)
+        self._idle: List[Tuple[aiosmtplib.SMTP, float]] = []
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            username=settings.SMTP_USER or None,
+            password=settings.SMTP_PASSWORD or None,
+            start_tls=settings.SMTP_STARTTLS,
+            timeout=settings.SMTP_TIMEOUT_SECONDS,
+        )
+        await client.connect()
+        return client
+
+    async def _checkout(self) -> aiosmtplib.SMTP:
+        while self._idle:
+            client, last_used = self._idle.pop()
+            if not client.is_connected:
+                continue
+            if time.monotonic() - last_used < IDLE_CHECK_SECONDS:
+                return client
+            try:
+                await client.noop()
+                return client
+            except aiosmtplib.SMTPException:
+                client.close()
+        return await self._connect()
+
+    @asynccontextmanager
+    async def connection(self):
+        async with self._slots:
+            client = await self._checkout()
+            try:
+                yield client
+            except BaseException:
+                # The session state is unknown after a failure; start afresh next time
+                client.close()
+                raise
+            self._idle.append((client, time.monotonic()))
+
+    async def close(self) -> None:
+        while self._idle:
+            client, _ = self._idle.pop()
+            try:
+                await client.quit()
+            except (aiosmtplib.SMTPException, OSError):
+                client.close()
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.EMAIL_RETRY_MAX_SECONDS))
+
+
+async def _deliver(pool: SMTPPool, row: EmailOutbox) -> Optional[Exception]:
+    # compat32 MIMEText: EmailMessage's header parsing costs more than the send
+    message = MIMEText(row.body, "plain", "utf-8")
+    message["From"] = settings.SMTP_USER
+    message["To"] = row.to_email
+    message["Subject"] = row.subject
+    try:
+        async with pool.connection() as client:
+            await client.sendmail(settings.SMTP_USER, [row.to_email], message.as_bytes())
+        return None
+    except (aiosmtplib.SMTPException, OSError, asyncio.TimeoutError) as e:
+        return e
+
+
+async def flush_outbox(pool: SMTPPool) -> int:
+    """Claim one batch of due messages, send it, and record the outcome.
+
+    Claiming sets a lease on the rows, so several workers (one per app
+    process) never send the same message twice unless one of them dies
+    mid-batch; its rows are picked up again when the lease runs out.
+    Returns the number of messages claimed.
+    """
+    async with AsyncSessionLocal() as db:
+        now = datetime.utcnow()
+        claim = uuid.uuid4().hex
+        due = (
+            select(EmailOutbox.id)
+            .where(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(settings.EMAIL_BATCH_SIZE)
+        )
+        await db.execute(
+            update(EmailOutbox)
+            # Repeated outside the subquery so a concurrent claim is re-checked
+            .where(EmailOutbox.id.in_(due), EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+            .values(claim=claim, next_attempt_at=now + timedelta(seconds=settings.EMAIL_CLAIM_LEASE_SECONDS))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        rows = (await db.execute(select(EmailOutbox).where(EmailOutbox.claim == claim))).scalars().all()
+        if not rows:
+            return 0
+
+        errors = await asyncio.gather(*(_deliver(pool, row) for row in rows))
+
+        now = datetime.utcnow()
+        sent = [row.id for row, error in zip(rows, errors) if error is None]
+        if sent:
+            await db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(sent))
+                .values(status="sent", sent_at=now, claim=None)
+                .execution_options(synchronize_session=False)
+            )
+        for row, error in zip(rows, errors):
+            if error is None:
+                continue
+            row.attempts += 1
+            row.claim = None
+            row.last_error = str(error)[:1000]
+            if isinstance(error, aiosmtplib.SMTPRecipientsRefused) or row.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                row.status = "failed"
+            else:
+                row.next_attempt_at = now + _backoff(row.attempts)
+        await db.commit()
+        if len(sent) < len(rows):
+            logger.warning("Email outbox: %d of %d messages failed", len(rows) - len(sent), len(rows))
+        return len(rows)
+
+
+class EmailWorker:
+    """Drains the outbox in the background until stopped."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    def start(self) -> None:
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def notify(self) -> None:
+        """Send newly queued mail now instead of at the next poll."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self) -> None:
+        """Finish the batch in flight, then close the SMTP connections."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self.notify()
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        pool = SMTPPool(settings.EMAIL_SMTP_POOL_SIZE)
+        try:
+            while not self._stopping:
+                self._wakeup.clear()
+                try:
+                    claimed = await flush_outbox(pool)
+                except Exception:
+                    logger.exception("Email outbox flush failed")
+                    claimed = 0
+                # A full batch means more may be waiting
+                if claimed >= settings.EMAIL_BATCH_SIZE:
+                    continue
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), settings.EMAIL_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await pool.close()
+
+
+email_worker = EmailWorker()
@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Callable, Iterator
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.engine import Result
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def encode_ndjson(result: Result) -> Iterator[str]:
+    """One JSON object per line, one chunk per fetched batch."""
+    keys = list(result.keys())
+    for rows in result.partitions():
+        yield "".join(
+            json.dumps(dict(zip(keys, map(_plain, row))), separators=(",", ":")) + "\n"
+            for row in rows
+        )
+
+
+def encode_csv(result: Result) -> Iterator[str]:
+    """A header line, then one chunk of CSV rows per fetched batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(result.keys())
+    for rows in result.partitions():
+        writer.writerows([_plain(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, when nothing matched
+    if buffer.getvalue():
+        yield buffer.getvalue()
+
+
+ENCODERS = {
+    "ndjson": encode_ndjson,
+    "csv": encode_csv,
+}
+
+
+def export_response(run: Callable[[Session], Result], format: str, filename: str) -> StreamingResponse:
+    """Stream the rows of ``run(db)`` as NDJSON or CSV.
+
+    The query runs inside the response body on its own session, so the first
+    batch is sent as soon as it is fetched and the connection is held only
+    while the body streams.
+    """
+    def body() -> Iterator[str]:
+        db = SessionLocal()
+        try:
+            yield from ENCODERS[format](run(db))
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'},
+    )
@@ -0,0 +1,66 @@
+"""Conditional GET: ETag / Last-Modified validators and 304 responses.
+
+ETags are weak validators hashed from the row versions (ids and
+updated_at) a response is built from, so they can be computed from a
+version-only query without loading or serializing the full response.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag over ``parts``; datetimes hash by their ISO form, as in the JSON bodies."""
+    raw = "|".join(part.isoformat() if isinstance(part, datetime) else str(part) for part in parts)
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+
+def as_datetime(value: Any) -> Optional[datetime]:
+    """updated_at from a row (datetime) or a cached record (ISO string)."""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def has_conditional_headers(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when it is absent (RFC 9110 13.2.2)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison: the W/ prefix is ignored
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole-second precision
+    return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+
+def set_validators(response: Response, etag: str, last_modified: Optional[datetime] = None, private: bool = False) -> Response:
+    """Add ETag / Last-Modified, and ask clients to revalidate before reusing the body."""
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        # Timestamps are stored as naive UTC
+        response.headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    response.headers["Cache-Control"] = "private, no-cache" if private else "no-cache"
+    return response
+
+
+def not_modified_response(etag: str, last_modified: Optional[datetime] = None, private: bool = False) -> Response:
+    return set_validators(Response(status_code=304), etag, last_modified, private)
@@ -0,0 +1,111 @@
+"""Idempotency-Key support for unsafe endpoints.
+
+begin_request() claims the key for the current request, or waits for the
+request that holds it and returns that request's stored response. Waiters
+on the same worker wake as soon as the owner finishes; waiters on other
+workers poll the key's row, reading only, until it completes.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from crud.aio.idempotency import claim_key, get_key, release_key
+from models.idempotency_key import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL_SECONDS = 0.05
+MAX_POLL_INTERVAL_SECONDS = 0.5
+
+# Keys owned by requests running on this worker
+_inflight: Dict[Tuple[int, str], asyncio.Event] = {}
+
+
+def request_fingerprint(body: BaseModel) -> str:
+    return hashlib.sha256(body.model_dump_json().encode()).hexdigest()
+
+
+def _claimable(record: Optional[IdempotencyKey]) -> bool:
+    now = datetime.utcnow()
+    return (
+        record is None
+        or record.expires_at <= now
+        or (record.status == "in_progress" and record.locked_until is not None and record.locked_until <= now)
+    )
+
+
+async def begin_request(db: AsyncSession, user_id: int, key: str, body: BaseModel) -> Tuple[Optional[str], Optional[Response]]:
+    """Claim ``key`` for this request, or wait for its owner and replay the result.
+
+    Returns ``(claim, None)`` when the caller should run the request and
+    then call finish_request() or abort_request(), and ``(None, response)``
+    when the key already has a stored response.
+    """
+    fingerprint = request_fingerprint(body)
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    interval = POLL_INTERVAL_SECONDS
+    try:
+        claim, record = await claim_key(db, user_id, key, fingerprint)
+        while True:
+            if claim:
+                _inflight[(user_id, key)] = asyncio.Event()
+                return claim, None
+            if record is not None:
+                if record.fingerprint != fingerprint:
+                    raise HTTPException(
+                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        detail="Idempotency-Key was already used with a different request body",
+                    )
+                if record.status == "completed":
+                    return None, Response(
+                        record.response_body,
+                        status_code=record.response_status,
+                        media_type="application/json",
+                        headers={"Idempotent-Replayed": "true"},
+                    )
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A request with this Idempotency-Key is still in progress",
+                )
+            owner = _inflight.get((user_id, key))
+            try:
+                if owner is not None:
+                    await asyncio.wait_for(owner.wait(), min(interval, remaining))
+                else:
+                    await asyncio.sleep(min(interval, remaining))
+            except asyncio.TimeoutError:
+                pass
+            interval = min(interval * 2, MAX_POLL_INTERVAL_SECONDS)
+
+            record = await get_key(db, user_id, key)
+            if _claimable(record):
+                claim, record = await claim_key(db, user_id, key, fingerprint)
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def finish_request(user_id: int, key: str) -> None:
+    """Wake this worker's waiters once the response is committed."""
+    owner = _inflight.pop((user_id, key), None)
+    if owner is not None:
+        owner.set()
+
+
+async def abort_request(db: AsyncSession, user_id: int, key: str, claim: str) -> None:
+    """Release the key after a failed request, so a retry runs it again."""
+    try:
+        await release_key(db, user_id, key, claim)
+    except ValueError:
+        # The lease runs out on its own
+        logger.exception("Failed to release idempotency key")
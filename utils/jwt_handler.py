@@ -1,11 +1,14 @@
+import hashlib
 import os
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from fastapi import HTTPException, status
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 
 from config import settings
+from utils.cache import TTLCache
 
 
 def load_rsa_keys():
@@ -33,6 +36,13 @@ def load_rsa_keys():
 
 private_key, public_key = load_rsa_keys()
 
+# Parse the PEMs once; python-jose re-parses string keys on every call
+signing_key = jwk.construct(private_key, settings.JWT_ALGORITHM)
+verifying_key = jwk.construct(public_key, settings.JWT_ALGORITHM)
+
+# SHA-256 of a verified token -> decoded payload, kept until the token's exp
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_MAX_SIZE, ttl=settings.TOKEN_CACHE_TTL_SECONDS)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -41,7 +51,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
 
     to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, private_key, algorithm=settings.JWT_ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, signing_key, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
 def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -52,12 +62,25 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.JWT_REFRESH_TOKEN_EXPIRE_MINUTES)
 
     to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, private_key, algorithm=settings.JWT_ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, signing_key, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
+def decode_token(token: str) -> dict:
+    """Verify a token's signature and claims, reusing recent verifications."""
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(digest)
+    if payload is not None and payload["exp"] > time.time():
+        return payload
+
+    payload = jwt.decode(token, verifying_key, algorithms=[settings.JWT_ALGORITHM])
+    if "exp" in payload:
+        remaining = payload["exp"] - time.time()
+        token_cache.set(digest, payload, ttl=min(remaining, settings.TOKEN_CACHE_TTL_SECONDS))
+    return payload
+
 def verify_token(token: str, token_type: str = "access"):
     try:
-        payload = jwt.decode(token, public_key, algorithms=[settings.JWT_ALGORITHM])
+        payload = decode_token(token)
 
         # Verify token type
         if payload.get("type") != token_type:
@@ -0,0 +1,36 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class LatencyRecorder:
+    """Keeps the most recent request durations and reports percentiles."""
+
+    def __init__(self, size: int = 10000):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._samples.append(elapsed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {"count": 0}
+
+        def percentile(p: float) -> float:
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))] * 1000, 3)
+
+        return {"count": len(samples), "p50_ms": percentile(0.50), "p99_ms": percentile(0.99)}
+
+
+catalog_latency = LatencyRecorder()
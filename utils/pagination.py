@@ -0,0 +1,96 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+
+class Cursor(NamedTuple):
+    sort_value: datetime
+    id: int
+    backwards: bool = False
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+    prev_cursor: Optional[str]
+
+
+def encode_cursor(sort_value: datetime, id: int, backwards: bool = False) -> str:
+    """Encode a (timestamp, id) position as an opaque URL-safe cursor."""
+    raw = json.dumps([sort_value.isoformat(), id, int(backwards)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    """Decode a cursor from a query parameter, raising 400 if it is malformed."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, id, backwards = json.loads(base64.urlsafe_b64decode(padded))
+        return Cursor(datetime.fromisoformat(sort_value), int(id), bool(backwards))
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def paginate(
+    query: Query,
+    sort_column,
+    id_column,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[Cursor] = None,
+    descending: bool = True,
+) -> Page:
+    """Page ``query`` by ``(sort_column, id_column)``.
+
+    Without a cursor this is plain offset pagination. With one, rows are
+    located by a keyset comparison, so deep pages cost the same as the first.
+    Both modes return cursors for the neighbouring pages.
+    """
+    backwards = cursor.backwards if cursor else False
+    # Walking backwards flips the comparison and the ordering
+    reverse = descending != backwards
+    key = tuple_(sort_column, id_column)
+
+    if cursor:
+        position = tuple_(cursor.sort_value, cursor.id)
+        query = query.filter(key < position if reverse else key > position)
+    if reverse:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+    if not cursor and skip:
+        query = query.offset(skip)
+
+    items = query.limit(limit + 1).all()
+    has_more = len(items) > limit
+    items = items[:limit]
+    if backwards:
+        items.reverse()
+    if not items:
+        return Page(items, None, None)
+
+    def cursor_for(item, backwards: bool) -> str:
+        return encode_cursor(getattr(item, sort_column.key), getattr(item, id_column.key), backwards)
+
+    has_next = has_more if not backwards else True
+    has_prev = has_more if backwards else bool(cursor or skip)
+    return Page(
+        items,
+        cursor_for(items[-1], False) if has_next else None,
+        cursor_for(items[0], True) if has_prev else None,
+    )
+
+
+def set_cursor_headers(response: Response, page: Page) -> None:
+    """Expose the page cursors as response headers, leaving the body a plain list."""
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.prev_cursor:
+        response.headers["X-Prev-Cursor"] = page.prev_cursor
@@ -0,0 +1,45 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from config import settings
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event
+# loop and caps how many cores a login burst can take.
+_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_DEPTH)
+
+
+def _submit(fn, *args) -> Future:
+    """Queue a hashing job, rejecting it with 503 when the queue is full."""
+    if not _slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        future = _executor.submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+async def hash_password(password: str) -> str:
+    return await asyncio.wrap_future(_submit(pwd_context.hash, password))
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.wrap_future(_submit(pwd_context.verify, plain_password, hashed_password))
+
+
+def hash_password_blocking(password: str) -> str:
+    """Hash on the pool from synchronous code (e.g. startup tasks)."""
+    return _submit(pwd_context.hash, password).result()
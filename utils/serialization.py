@@ -0,0 +1,57 @@
+"""JSON responses that validate once and encode straight to bytes.
+
+A route that returns plain objects gets them validated against its
+``response_model`` by FastAPI, dumped back to Python, run through
+``jsonable_encoder`` and only then encoded. The helpers here do one
+pydantic-core validation pass (or none, for data that is already a model or
+already JSON-ready) and hand the bytes to a ``Response``, which FastAPI
+sends as is. Routes keep ``response_model`` for the OpenAPI schema.
+"""
+from typing import Any, List
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+from schemas.invoice import InvoiceListOut
+from schemas.order import OrderListOut, OrderOut
+
+# Building an adapter compiles its validator and serializer; do it once
+order_list_adapter = TypeAdapter(List[OrderListOut])
+order_out_list_adapter = TypeAdapter(List[OrderOut])
+invoice_list_adapter = TypeAdapter(List[InvoiceListOut])
+
+
+def model_response(adapter: TypeAdapter, data: Any, status_code: int = 200) -> Response:
+    """Validate ORM objects or rows against ``adapter`` and encode the result.
+
+    The schemas set ``from_attributes`` in their config; passing it per call
+    as well takes a slower validation path.
+    """
+    content = adapter.dump_json(adapter.validate_python(data))
+    return Response(content, status_code=status_code, media_type="application/json")
+
+
+def encode_model(model: BaseModel) -> bytes:
+    """JSON bytes of an already validated model, without validating it again."""
+    return model.__pydantic_serializer__.to_json(model)
+
+
+def encode_json(data: Any) -> bytes:
+    """JSON bytes of plain dicts and lists, e.g. the cached product payloads."""
+    return orjson.dumps(data)
+
+
+def raw_json_response(content: bytes, status_code: int = 200) -> Response:
+    """Wrap JSON that is already encoded, e.g. a body shared by coalesced requests."""
+    return Response(content, status_code=status_code, media_type="application/json")
+
+
+def json_response(model: BaseModel, status_code: int = 200) -> Response:
+    """Encode an already validated model without validating it again."""
+    return raw_json_response(encode_model(model), status_code)
+
+
+def orjson_response(data: Any, status_code: int = 200) -> Response:
+    """Encode plain dicts and lists, e.g. the cached product payloads."""
+    return raw_json_response(encode_json(data), status_code)
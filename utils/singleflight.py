@@ -0,0 +1,54 @@
+"""Request coalescing: concurrent identical reads share one in-flight call.
+
+The first caller for a key starts the work as its own task; callers that
+arrive with the same key while it runs await that task instead of
+repeating the query. Nothing is kept once it finishes, so this never
+serves stale data; it only collapses bursts.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls by key within this worker's event loop."""
+
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Return ``await fn()``, sharing one call among concurrent callers of ``key``.
+
+        ``fn`` runs in its own task, so a caller that disconnects does not
+        cancel it for the others; it must not use request-scoped state such
+        as the request's DB session.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        self._calls.pop(key, None)
+        # Mark a failure as seen even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        calls = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._calls),
+            "executed": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": round(self.coalesced / calls, 4) if calls else 0.0,
+        }
+
+
+product_flight = SingleFlight()
+order_flight = SingleFlight()
@@ -0,0 +1,42 @@
+"""Background refresh of the cached stock totals of sharded products."""
+import asyncio
+import logging
+from typing import Optional
+
+from config import settings
+from crud.aio.inventory import refresh_sharded_stock
+from database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class StockRefresher:
+    """Runs refresh_sharded_stock every STOCK_SHARD_REFRESH_SECONDS until stopped."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await refresh_sharded_stock(db)
+            except ValueError:
+                logger.exception("Sharded stock refresh failed")
+            await asyncio.sleep(settings.STOCK_SHARD_REFRESH_SECONDS)
+
+
+stock_refresher = StockRefresher()